@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+批量生成头像/占位图 - 多进程统一入口
+Usage:
+    python3 batch_generate.py <kind> [--users USERS_TXT] [--output DIR] [--jobs N] [--batch-size N] [--force]
+                             [--xcassets CATALOG_DIR]
+
+Arguments:
+    kind           avatars | avatars-pro | placeholders | placeholders-pro
+    --users        Text file with one user name per line (avatars / avatars-pro only;
+                   default: the AVATARS list of the generator script)
+    --output       Output directory (default: the generator script's OUTPUT_DIR)
+    --jobs         Worker processes (default: one per CPU)
+    --batch-size   Images rendered per task sent to a worker (default: 32)
+    --force        Re-render every image, ignoring the render manifest
+    --xcassets     Write <name>.imageset directories (@1x/@2x/@3x + Contents.json)
+                   into this asset catalog instead of plain PNGs into --output
+
+Examples:
+    python3 batch_generate.py avatars-pro
+    python3 batch_generate.py avatars --users seed_users.txt --output ./generated_avatars --jobs 16
+    python3 batch_generate.py avatars --xcassets wldo/Assets.xcassets
+
+Each worker loads every font once (see fonts.py) and keeps its own gradient
+template cache; at most jobs * 4 batches are queued at any time, so a huge
+user list is streamed instead of being expanded up front.
+
+Images whose render key is unchanged (see render_cache.py) are not sent to
+the workers at all; the manifest is updated by this process only.
+"""
+
+import os
+import sys
+import hashlib
+import argparse
+import itertools
+from typing import Callable, NamedTuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import generate_avatars
+import generate_avatars_pro
+import generate_placeholders
+import generate_placeholders_pro
+from render_cache import RenderManifest
+from xcassets import MASTER_SCALE, ensure_catalog, imageset_key, write_imageset
+
+class Generator(NamedTuple):
+    save: Callable      # (item, output_path): render at 1x and write a PNG
+    render: Callable    # (item, scale): rendered Image
+    key: Callable       # (item): render cache key
+    output_dir: str
+
+GENERATORS = {
+    "avatars": Generator(generate_avatars.generate_avatar, generate_avatars.render_avatar,
+                         generate_avatars.render_key, generate_avatars.OUTPUT_DIR),
+    "avatars-pro": Generator(generate_avatars_pro.generate_avatar, generate_avatars_pro.render_avatar,
+                             generate_avatars_pro.render_key, generate_avatars_pro.OUTPUT_DIR),
+    "placeholders": Generator(generate_placeholders.generate_placeholder, generate_placeholders.render_placeholder,
+                              generate_placeholders.render_key, generate_placeholders.OUTPUT_DIR),
+    "placeholders-pro": Generator(generate_placeholders_pro.generate_placeholder,
+                                  generate_placeholders_pro.render_placeholder,
+                                  generate_placeholders_pro.render_key, generate_placeholders_pro.OUTPUT_DIR),
+}
+
+def read_users(path):
+    """Yield user names from a text file, one per line, skipping blanks and # comments."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            name = line.strip()
+            if name and not name.startswith('#'):
+                yield name
+
+def pro_avatar_config(name):
+    """avatars-pro config for an arbitrary user: emoji and gradient picked from the name's hash."""
+    hash_value = int(hashlib.md5(name.encode()).hexdigest(), 16)
+    return {
+        "name": name,
+        "emoji": generate_avatars_pro.AVATARS[hash_value % len(generate_avatars_pro.AVATARS)]["emoji"],
+        "gradient": hash_value % len(generate_avatars_pro.GRADIENT_COLORS),
+    }
+
+def iter_tasks(kind, output_dir, users=None, suffix=".png"):
+    """Yield (item, output_path) for every image of kind; suffix is .png or .imageset."""
+    if kind == "avatars":
+        for name in users if users is not None else generate_avatars.AVATARS:
+            yield name, os.path.join(output_dir, f"avatar_{name}{suffix}")
+    elif kind == "avatars-pro":
+        configs = map(pro_avatar_config, users) if users is not None else generate_avatars_pro.AVATARS
+        for config in configs:
+            yield config, os.path.join(output_dir, f"avatar_{config['name']}{suffix}")
+    elif kind == "placeholders":
+        for config in generate_placeholders.PLACEHOLDERS:
+            yield config, os.path.join(output_dir, f"{config['name']}{suffix}")
+    else:
+        for config in generate_placeholders_pro.PLACEHOLDER_CONFIGS:
+            yield config, os.path.join(output_dir, f"{config['name']}{suffix}")
+
+def stale_tasks(kind, tasks, manifest, force=False, xcassets=False):
+    """Yield (item, output_path, key) for every task whose output is not fresh in manifest."""
+    key_for = GENERATORS[kind].key
+    for item, output_path in tasks:
+        key = imageset_key(key_for(item)) if xcassets else key_for(item)
+        if force or not manifest.fresh(output_path, key):
+            yield item, output_path, key
+
+def render_batch(kind, batch, xcassets=False):
+    """Worker entry point: render a batch of (item, output_path). Returns the count."""
+    generator = GENERATORS[kind]
+    for item, output_path in batch:
+        if xcassets:
+            # One full render at @3x; @2x and @1x are downsampled from it
+            changed = write_imageset(output_path, generator.render(item, MASTER_SCALE))
+            print(f"{'✓' if changed else '='} {os.path.basename(output_path)}")
+        else:
+            generator.save(item, output_path)
+    return len(batch)
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def run(kind, tasks, jobs, batch_size=32, manifest=None, xcassets=False):
+    """Render every (item, output_path, key) task on a process pool with a bounded queue.
+
+    Finished images are recorded in manifest as their batch completes.
+    Returns the number of images.
+    """
+    done = 0
+
+    def finish(batch):
+        nonlocal done
+        done += len(batch)
+        if manifest is not None:
+            for _, output_path, key in batch:
+                manifest.record(output_path, key)
+
+    if jobs <= 1:
+        for batch in batched(tasks, batch_size):
+            render_batch(kind, [(item, output_path) for item, output_path, _ in batch], xcassets)
+            finish(batch)
+        return done
+
+    max_pending = jobs * 4
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = {}
+        for batch in batched(tasks, batch_size):
+            if len(pending) >= max_pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+                    finish(pending.pop(future))
+            future = executor.submit(render_batch, kind, [(item, output_path) for item, output_path, _ in batch],
+                                     xcassets)
+            pending[future] = batch
+        for future in wait(pending).done:
+            future.result()
+            finish(pending[future])
+    return done
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch avatar / placeholder generator")
+    parser.add_argument("kind", choices=sorted(GENERATORS), help="What to generate")
+    parser.add_argument("--users", default=None, help="Text file with one user name per line")
+    parser.add_argument("--output", default=None, help="Output directory (default: the generator's OUTPUT_DIR)")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes (default: 0 = one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Images per task sent to a worker (default: 32)")
+    parser.add_argument("--force", action="store_true", help="Re-render every image, ignoring the render manifest")
+    parser.add_argument("--xcassets", default=None, metavar="CATALOG_DIR",
+                        help="Write .imageset directories into this asset catalog instead of PNGs")
+    args = parser.parse_args()
+
+    if args.users and args.kind not in ("avatars", "avatars-pro"):
+        print("❌ Error: --users only applies to avatars and avatars-pro.")
+        sys.exit(1)
+
+    if args.xcassets and args.output:
+        print("❌ Error: --output and --xcassets are mutually exclusive.")
+        sys.exit(1)
+
+    if args.xcassets:
+        output_dir = args.xcassets
+        ensure_catalog(output_dir)
+    else:
+        output_dir = args.output or GENERATORS[args.kind].output_dir
+        os.makedirs(output_dir, exist_ok=True)
+    jobs = args.jobs or os.cpu_count()
+
+    print(f"🎨 Generating {args.kind} with {jobs} worker(s)...")
+    print(f"📁 Output: {output_dir}/\n")
+
+    users = read_users(args.users) if args.users else None
+    manifest = RenderManifest.load(output_dir)
+    total = 0
+
+    def counted(tasks):
+        nonlocal total
+        for task in tasks:
+            total += 1
+            yield task
+
+    xcassets = args.xcassets is not None
+    suffix = ".imageset" if xcassets else ".png"
+    tasks = stale_tasks(args.kind, counted(iter_tasks(args.kind, output_dir, users, suffix)), manifest,
+                        args.force, xcassets)
+    try:
+        count = run(args.kind, tasks, jobs, args.batch_size, manifest, xcassets)
+    finally:
+        # Keep what finished even if the run is interrupted
+        manifest.save()
+
+    print(f"\n✅ Generated {count} image(s) in {output_dir}/ ({total - count} unchanged)")
+
+if __name__ == "__main__":
+    main()
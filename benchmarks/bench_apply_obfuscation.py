@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: apply_obfuscation scaling versus mapping size
+--------------------------------------------------------
+Usage:
+    python3 benchmarks/bench_apply_obfuscation.py [--files N] [--sizes 100,1000,5000]
+
+Generates a synthetic Swift tree, then rewrites it with the old per-entry regex
+loop and with swift_obfuscate.build_rewriter for each mapping size, checking the
+outputs are byte-identical.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import string
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swift_obfuscate import build_rewriter, random_name
+
+def legacy_rewrite(text: str, mapping: dict) -> str:
+    """The per-entry loop apply_obfuscation used before the single-pass rewriter."""
+    sorted_pairs = sorted(mapping.items(), key=lambda x: len(x[0]), reverse=True)
+    for original_name, obfuscated_name in sorted_pairs:
+        pattern = re.compile(r'\b' + re.escape(original_name) + r'\b')
+        text = pattern.sub(obfuscated_name, text)
+    return text
+
+def make_names(count: int, rng: random.Random) -> list:
+    names = set()
+    while len(names) < count:
+        head = rng.choice(string.ascii_lowercase)
+        names.add(head + ''.join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(5, 20))))
+    return sorted(names)
+
+def make_tree(root: Path, files: int, names: list, rng: random.Random):
+    for i in range(files):
+        lines = []
+        for _ in range(200):
+            name = rng.choice(names)
+            other = rng.choice(names)
+            lines.append(f"    func {name}(value: Int) -> Int {{ return {other}(value: value) + 1 }}")
+        (root / f"File{i}.swift").write_text("class File%d {\n%s\n}\n" % (i, "\n".join(lines)), encoding='utf-8')
+
+def main():
+    parser = argparse.ArgumentParser(description="apply_obfuscation mapping-size benchmark")
+    parser.add_argument("--files", type=int, default=20, help="Number of synthetic .swift files (default: 20)")
+    parser.add_argument("--sizes", default="100,1000,5000", help="Comma-separated mapping sizes")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = make_names(max(sizes), rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root, args.files, names, rng)
+        texts = [path.read_text(encoding='utf-8') for path in sorted(root.glob("*.swift"))]
+        megabytes = sum(len(text) for text in texts) / 1e6
+
+        print(f"{args.files} files, {megabytes:.2f} MB")
+        print(f"{'entries':>8s} {'legacy (s)':>12s} {'single-pass (s)':>16s} {'speedup':>8s}")
+        for size in sizes:
+            mapping = {name: random_name("ox") for name in names[:size]}
+
+            start = time.perf_counter()
+            expected = [legacy_rewrite(text, mapping) for text in texts]
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            rewrite = build_rewriter(mapping)
+            actual = [rewrite(text) for text in texts]
+            single = time.perf_counter() - start
+
+            assert actual == expected, f"output differs for mapping size {size}"
+            print(f"{size:8d} {legacy:12.3f} {single:16.3f} {legacy / single:7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized gradients versus the per-pixel loops
+----------------------------------------------------------
+Usage:
+    python3 benchmarks/bench_gradients.py [--sizes 300,600] [--repeat 3]
+
+Renders every avatar and placeholder gradient with the old pure-Python loops
+and with gradients.py, asserting pixel-identical output.
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gradients import hex_to_rgb, radial_gradient, vertical_gradient
+from generate_avatars_pro import GRADIENT_COLORS
+from generate_placeholders import PLACEHOLDERS
+from generate_placeholders_pro import PLACEHOLDER_CONFIGS
+
+def legacy_radial_gradient(width, height, color1, color2):
+    """generate_avatars_pro.create_radial_gradient before vectorization."""
+    img = Image.new('RGB', (width, height))
+    r1, g1, b1 = hex_to_rgb(color1)
+    r2, g2, b2 = hex_to_rgb(color2)
+    center_x, center_y = width // 2, height // 2
+    max_radius = math.sqrt(center_x**2 + center_y**2)
+    for y in range(height):
+        for x in range(width):
+            dx = x - center_x
+            dy = y - center_y
+            distance = math.sqrt(dx*dx + dy*dy)
+            ratio = min(distance / max_radius, 1.0)
+            r = int(r1 + (r2 - r1) * ratio)
+            g = int(g1 + (g2 - g1) * ratio)
+            b = int(b1 + (b2 - b1) * ratio)
+            img.putpixel((x, y), (r, g, b))
+    return img
+
+def legacy_multi_gradient(width, height, colors):
+    """generate_placeholders_pro.create_multi_gradient before vectorization."""
+    img = Image.new('RGB', (width, height))
+    draw = ImageDraw.Draw(img)
+    num_colors = len(colors)
+    segment_height = height // (num_colors - 1)
+    for segment in range(num_colors - 1):
+        r1, g1, b1 = hex_to_rgb(colors[segment])
+        r2, g2, b2 = hex_to_rgb(colors[segment + 1])
+        start_y = segment * segment_height
+        end_y = (segment + 1) * segment_height
+        for y in range(start_y, min(end_y, height)):
+            ratio = (y - start_y) / segment_height
+            r = int(r1 + (r2 - r1) * ratio)
+            g = int(g1 + (g2 - g1) * ratio)
+            b = int(b1 + (b2 - b1) * ratio)
+            draw.line([(0, y), (width, y)], fill=(r, g, b))
+    return img
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Gradient renderer benchmark")
+    parser.add_argument("--sizes", default="300,600", help="Comma-separated square sizes for radial gradients")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repeat count")
+    args = parser.parse_args()
+
+    print(f"{'gradient':>28s} {'legacy (ms)':>12s} {'numpy (ms)':>11s} {'speedup':>8s}")
+    for size in [int(size) for size in args.sizes.split(",")]:
+        for gradient in GRADIENT_COLORS:
+            legacy, expected = timed(lambda: legacy_radial_gradient(size, size, gradient["start"], gradient["end"]), args.repeat)
+            fast, actual = timed(lambda: radial_gradient(size, size, gradient["start"], gradient["end"]), args.repeat)
+            assert actual.tobytes() == expected.tobytes(), f"radial {gradient['name']} {size}px differs"
+            print(f"{gradient['name'] + f' {size}px':>28s} {legacy * 1e3:12.1f} {fast * 1e3:11.2f} {legacy / fast:7.0f}x")
+
+    for config in PLACEHOLDER_CONFIGS + PLACEHOLDERS:
+        legacy, expected = timed(lambda: legacy_multi_gradient(400, 600, config["colors"]), args.repeat)
+        fast, actual = timed(lambda: vertical_gradient(400, 600, config["colors"]), args.repeat)
+        assert actual.tobytes() == expected.tobytes(), f"linear {config['name']} differs"
+        print(f"{config['name']:>28s} {legacy * 1e3:12.1f} {fast * 1e3:11.2f} {legacy / fast:7.0f}x")
+
+if __name__ == "__main__":
+    main()
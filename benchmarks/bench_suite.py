@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: obfuscators and image generators
+-------------------------------------------------
+Usage:
+    python3 benchmarks/bench_suite.py [--only PREFIX] [--quick] [--repeat N]
+                                      [--output RESULTS_JSON] [--baseline BASELINE_JSON] [--threshold PCT]
+
+Cases:
+    swift_extract / swift_apply   swift_obfuscate.extract_method_names / apply_obfuscation on a
+                                  synthetic Swift tree (--swift-files, --mapping-sizes, --jobs)
+    project                       obfuscate_project.process_directory on a tree of mixed text and
+                                  binary files (--project-files, --binary-ratio)
+    images                        render + save every generator kind (--image-counts, --image-scales),
+                                  with and without png_optimize
+
+Examples:
+    python3 benchmarks/bench_suite.py --output before.json
+    python3 benchmarks/bench_suite.py --baseline before.json --output after.json
+    python3 benchmarks/bench_suite.py --only swift_apply --mapping-sizes 100,10000 --jobs 1,4
+
+Every case runs in a freshly spawned process, so the reported peak RSS
+belongs to that case alone. Synthetic data is built before the clock starts
+and rebuilt for every repeat (both obfuscators rewrite in place); the best
+repeat is reported. MB/s counts the tree read by the obfuscators and the
+PNG bytes written by the generators. With --baseline, cases slower by more than --threshold
+percent are listed and the exit status is 1.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import string
+import itertools
+import argparse
+import platform
+import tempfile
+import contextlib
+import multiprocessing
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def make_names(count, rng):
+    names = set()
+    while len(names) < count:
+        head = rng.choice(string.ascii_lowercase)
+        names.add(head + ''.join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(5, 20))))
+    return sorted(names)
+
+SWIFT_LINES = (
+    "    func {a}(value: Int) -> Int {{ return {b}(value: value) + 1 }}",
+    "    // {a} is called from {b}",
+    "    let label = \"{a} \\({b}(value: 2))\"",
+    "    @objc func {a}Tapped(_ sender: Any) {{ {b}(value: 0) }}",
+    "    /* {a}\n       {b} */",
+    "    private var {a}Cache: [String: Int] = [:]",
+    "    override func viewDidLoad() {{ super.viewDidLoad(); _ = {a}(value: 3) }}",
+    "    button.addTarget(self, action: #selector({a}Tapped(_:)), for: .touchUpInside)",
+)
+
+def make_swift_tree(root, files, names, rng, lines_per_file=200):
+    """files .swift files spread over a few directories, each lines_per_file long."""
+    for i in range(files):
+        directory = root / f"Module{i % 8}"
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = [rng.choice(SWIFT_LINES).format(a=rng.choice(names), b=rng.choice(names))
+                 for _ in range(lines_per_file)]
+        (directory / f"File{i}.swift").write_text("class File%d {\n%s\n}\n" % (i, "\n".join(lines)),
+                                                  encoding='utf-8')
+
+TEXT_TEMPLATES = {
+    ".swift": "import UIKit\n\nclass WLD{name}Controller: UIViewController {{\n    let service = WLD{name}Service()\n}}\n",
+    ".h": "#import <Foundation/Foundation.h>\n\n@interface WLD{name}Model : NSObject\n@property NSString *WLD{name}Key;\n@end\n",
+    ".m": "#import \"WLD{name}Model.h\"\n\n@implementation WLD{name}Model\n- (void)load {{ [WLD{name}Cache shared]; }}\n@end\n",
+    ".json": "{{\"class\": \"WLD{name}Model\", \"identifier\": \"WLD{name}Cell\"}}\n",
+    ".xib": "<objects><view customClass=\"WLD{name}View\" customModule=\"wldo\"/></objects>\n",
+}
+BINARY_HEADERS = {".png": b'\x89PNG\r\n\x1a\n', ".jpg": b'\xff\xd8\xff\xe0', ".a": b'!<arch>\n'}
+
+def make_project_tree(root, files, binary_ratio, rng, text_repeat=40, binary_size=64 * 1024):
+    """Mixed project: WLD-prefixed text sources and binary assets, some WLD-named."""
+    for i in range(files):
+        directory = root / f"WLDGroup{i % 16}" / ("Resources" if i % 3 == 0 else "Sources")
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"Thing{i}"
+        if rng.random() < binary_ratio:
+            suffix = rng.choice(sorted(BINARY_HEADERS))
+            data = BINARY_HEADERS[suffix] + rng.randbytes(binary_size) + b"WLDInsideBinary"
+            (directory / f"WLD{name}{suffix}").write_bytes(data)
+        else:
+            suffix = rng.choice(sorted(TEXT_TEMPLATES))
+            text = TEXT_TEMPLATES[suffix].format(name=name) * text_repeat
+            (directory / f"WLD{name}{suffix}").write_text(text, encoding='utf-8')
+
+def tree_size(root):
+    count = size = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            count += 1
+            size += os.path.getsize(os.path.join(dirpath, filename))
+    return count, size
+
+# ---------------------------------------------------------------------------
+# Cases: each returns (seconds, {"files": n, "bytes": n, "images": n})
+# ---------------------------------------------------------------------------
+
+def case_swift(params, workdir):
+    from swift_obfuscate import apply_obfuscation, build_mapping, extract_method_names
+
+    rng = random.Random(0)
+    names = make_names(params["mapping"], rng)
+    root = Path(workdir) / "swift"
+    make_swift_tree(root, params["files"], names, rng)
+    files, size = tree_size(root)
+
+    if params["stage"] == "extract":
+        start = time.perf_counter()
+        extract_method_names(str(root), jobs=params["jobs"])
+    else:
+        mapping = build_mapping(set(names), "ox", seed="bench")
+        start = time.perf_counter()
+        apply_obfuscation(str(root), mapping, jobs=params["jobs"])
+    return time.perf_counter() - start, {"files": files, "bytes": size}
+
+def case_project(params, workdir):
+    from obfuscate_project import build_engine, process_directory
+
+    root = Path(workdir) / "project"
+    make_project_tree(root, params["files"], params["binary_ratio"], random.Random(0))
+    files, size = tree_size(root)
+    engine = build_engine({"WLDThing1Model": "KNOFirstModel"}, "WLD", "KNO")
+
+    start = time.perf_counter()
+    process_directory(str(root), engine=engine)
+    return time.perf_counter() - start, {"files": files, "bytes": size}
+
+def case_images(params, workdir):
+    from batch_generate import GENERATORS, iter_tasks
+    from png_optimize import save_png
+
+    generator = GENERATORS[params["kind"]]
+    users = [f"user{i}" for i in range(params["count"])]
+    if params["kind"] in ("avatars", "avatars-pro"):
+        tasks = list(iter_tasks(params["kind"], workdir, users))
+    else:
+        # Only a handful of placeholder configs exist; cycle them under new file names
+        configs = [item for item, _ in iter_tasks(params["kind"], workdir)]
+        tasks = [(config, os.path.join(workdir, f"{i}.png"))
+                 for i, config in zip(range(params["count"]), itertools.cycle(configs))]
+
+    start = time.perf_counter()
+    for item, output_path in tasks:
+        img = generator.render(item, params["scale"])
+        if params["optimize"]:
+            save_png(img, output_path)
+        else:
+            img.save(output_path, 'PNG')
+    seconds = time.perf_counter() - start
+    return seconds, {"images": len(tasks), "bytes": sum(os.path.getsize(path) for _, path in tasks)}
+
+CASES = {"swift": case_swift, "project": case_project, "images": case_images}
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def run_case(case, params, repeat):
+    """Child process entry point: best of repeat runs, plus this process's peak RSS."""
+    best, counts = float('inf'), {}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+            seconds, counts = CASES[case](params, workdir)
+        best = min(best, seconds)
+    return best, counts, peak_rss_mb()
+
+# ---------------------------------------------------------------------------
+# Suite
+# ---------------------------------------------------------------------------
+
+def case_name(case, params):
+    label = f"swift_{params['stage']}" if case == "swift" else case
+    return label + "[" + ",".join(f"{key}={value}" for key, value in params.items() if key != "stage") + "]"
+
+def plan(args):
+    """Yield (case, params) for every configured benchmark."""
+    for jobs in args.jobs:
+        for files in args.swift_files:
+            yield "swift", {"stage": "extract", "files": files, "mapping": max(args.mapping_sizes), "jobs": jobs}
+            for mapping in args.mapping_sizes:
+                yield "swift", {"stage": "apply", "files": files, "mapping": mapping, "jobs": jobs}
+    for files in args.project_files:
+        yield "project", {"files": files, "binary_ratio": args.binary_ratio}
+    for kind in ("avatars", "avatars-pro", "placeholders", "placeholders-pro"):
+        for count in args.image_counts:
+            for scale in args.image_scales:
+                for optimize in (False, True):
+                    yield "images", {"kind": kind, "count": count, "scale": scale, "optimize": optimize}
+
+def throughput(seconds, counts):
+    result = {"seconds": round(seconds, 4)}
+    if "files" in counts:
+        result["files_per_s"] = round(counts["files"] / seconds, 1)
+    if "images" in counts:
+        result["images_per_s"] = round(counts["images"] / seconds, 1)
+    result["mb_per_s"] = round(counts["bytes"] / 1e6 / seconds, 2)
+    return result
+
+def compare(results, baseline, threshold):
+    """Print the change against baseline per case; returns the names that regressed."""
+    previous = {entry["name"]: entry for entry in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':60s} {'baseline (s)':>13s} {'now (s)':>9s} {'change':>8s}")
+    for entry in results:
+        old = previous.get(entry["name"])
+        if old is None:
+            continue
+        change = (entry["seconds"] - old["seconds"]) * 100 / old["seconds"]
+        flag = " ⚠️" if change > threshold else ""
+        print(f"{entry['name']:60s} {old['seconds']:13.3f} {entry['seconds']:9.3f} {change:+7.1f}%{flag}")
+        if change > threshold:
+            regressions.append(entry["name"])
+    return regressions
+
+def int_list(value):
+    return [int(part) for part in value.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description="Obfuscator and image generator benchmark suite")
+    parser.add_argument("--only", default=None, help="Run only cases whose name starts with this prefix")
+    parser.add_argument("--quick", action="store_true", help="Small sizes, for a smoke test")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repeat count (default: 3)")
+    parser.add_argument("--swift-files", type=int_list, default=[200], help="Comma-separated Swift tree sizes")
+    parser.add_argument("--mapping-sizes", type=int_list, default=[100, 1000, 5000], help="Comma-separated mapping sizes")
+    parser.add_argument("--jobs", type=int_list, default=[1], help="Comma-separated worker counts for swift cases")
+    parser.add_argument("--project-files", type=int_list, default=[2000], help="Comma-separated project tree sizes")
+    parser.add_argument("--binary-ratio", type=float, default=0.3, help="Share of binary files in project trees")
+    parser.add_argument("--image-counts", type=int_list, default=[50], help="Comma-separated image counts")
+    parser.add_argument("--image-scales", type=int_list, default=[1, 3], help="Comma-separated render scales")
+    parser.add_argument("--output", default=None, help="Write results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Compare against an earlier --output file")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent (default: 10)")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.swift_files, args.mapping_sizes, args.project_files = [20], [100, 1000], [200]
+        args.image_counts, args.image_scales, args.repeat = [5], [1], 1
+
+    # A fresh interpreter per case keeps peak RSS and caches from leaking between cases
+    context = multiprocessing.get_context("spawn")
+    results = []
+    print(f"{'case':60s} {'seconds':>8s} {'files/s':>9s} {'images/s':>9s} {'MB/s':>8s} {'peak MB':>8s}")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for case, params in plan(args):
+            name = case_name(case, params)
+            if args.only and not name.startswith(args.only):
+                continue
+            seconds, counts, peak = pool.apply(run_case, (case, params, args.repeat))
+            entry = {"name": name, "case": case, "params": params, **throughput(seconds, counts),
+                     "peak_rss_mb": round(peak, 1)}
+            results.append(entry)
+            print(f"{name:60s} {seconds:8.3f} {entry.get('files_per_s', ''):>9} "
+                  f"{entry.get('images_per_s', ''):>9} {entry['mb_per_s']:8.2f} {entry['peak_rss_mb']:8.1f}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} case(s) slower than the baseline by more than {args.threshold:g}%")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:g}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+字体缓存 - 每个进程每种字体只加载一次
+The generators used to call ImageFont.truetype (and walk the whole
+Apple Color Emoji / Helvetica / Arial fallback chain, exceptions included)
+for every image. Fonts and failed lookups are now cached per process.
+"""
+
+import functools
+
+from PIL import ImageFont
+
+EMOJI_FONT = "/System/Library/Fonts/Apple Color Emoji.ttc"
+HELVETICA_FONT = "/System/Library/Fonts/Helvetica.ttc"
+ARIAL_FONT = "/Library/Fonts/Arial.ttf"
+SF_PRO_BOLD_FONT = "/System/Library/Fonts/SF-Pro-Display-Bold.otf"
+
+@functools.lru_cache(maxsize=None)
+def load_font(size, *paths):
+    """First of paths that loads as a TrueType font at size, or None if none does."""
+    for path in paths:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return None
+
+@functools.lru_cache(maxsize=None)
+def default_font():
+    return ImageFont.load_default()
+
+def text_font(size, *paths):
+    """Like load_font, falling back to Pillow's default font."""
+    return load_font(size, *paths) or default_font()
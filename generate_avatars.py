@@ -4,14 +4,19 @@
 为所有用户名生成彩色圆形头像，带有首字母缩写
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import hashlib
 import os
 
+from fonts import text_font, HELVETICA_FONT, ARIAL_FONT
+from render_cache import RenderManifest, render_key as cache_key
+from png_optimize import save_png
+
 # 配置
 OUTPUT_DIR = "./generated_avatars"
 AVATAR_SIZE = 200  # 头像尺寸
 FONT_SIZE = 80     # 字体大小
+GENERATOR_VERSION = 1  # 绘制代码改动时加一，让渲染缓存失效
 
 # 需要生成的头像列表
 AVATARS = [
@@ -81,45 +86,50 @@ def get_initials(name):
     else:
         return name[:2].upper()
 
-def generate_avatar(name, output_path):
-    """生成单个头像"""
+def render_key(name):
+    """渲染缓存键：名称、颜色、缩写、尺寸和字体都参与哈希"""
+    config = {"name": name, "color": get_color_for_name(name), "initials": get_initials(name), "font_size": FONT_SIZE}
+    return cache_key("generate_avatars", GENERATOR_VERSION, config, (AVATAR_SIZE, AVATAR_SIZE),
+                     (HELVETICA_FONT, ARIAL_FONT))
+
+def render_avatar(name, scale=1):
+    """渲染单个头像，scale 为倍率（xcassets 的 @3x 母版用 scale=3）"""
+    size = AVATAR_SIZE * scale
+    
     # 创建图片
-    img = Image.new('RGB', (AVATAR_SIZE, AVATAR_SIZE), 'white')
+    img = Image.new('RGB', (size, size), 'white')
     draw = ImageDraw.Draw(img)
     
     # 获取颜色
     bg_color = get_color_for_name(name)
     
     # 绘制圆形背景
-    draw.ellipse([0, 0, AVATAR_SIZE, AVATAR_SIZE], fill=bg_color)
+    draw.ellipse([0, 0, size, size], fill=bg_color)
     
     # 获取缩写
     initials = get_initials(name)
     
-    # 尝试使用系统字体，如果失败则使用默认字体
-    try:
-        # macOS常见字体
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", FONT_SIZE)
-    except:
-        try:
-            font = ImageFont.truetype("/Library/Fonts/Arial.ttf", FONT_SIZE)
-        except:
-            # 使用默认字体
-            font = ImageFont.load_default()
+    # 尝试使用系统字体（macOS常见字体），如果失败则使用默认字体；每个进程只加载一次
+    font = text_font(FONT_SIZE * scale, HELVETICA_FONT, ARIAL_FONT)
     
     # 计算文字位置（居中）
     bbox = draw.textbbox((0, 0), initials, font=font)
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
     
-    text_x = (AVATAR_SIZE - text_width) // 2
-    text_y = (AVATAR_SIZE - text_height) // 2 - 5  # 微调垂直位置
+    text_x = (size - text_width) // 2
+    text_y = (size - text_height) // 2 - 5 * scale  # 微调垂直位置
     
     # 绘制文字
     draw.text((text_x, text_y), initials, fill='white', font=font)
+    return img
+
+def generate_avatar(name, output_path):
+    """生成单个头像"""
+    img = render_avatar(name)
     
     # 保存图片
-    img.save(output_path, 'PNG')
+    save_png(img, output_path)
     print(f"✓ Generated: {output_path}")
 
 def main():
@@ -132,12 +142,20 @@ def main():
     print(f"🖼️  Avatar size: {AVATAR_SIZE}x{AVATAR_SIZE}")
     print(f"📝 Total avatars to generate: {len(AVATARS)}\n")
     
-    # 生成所有头像
+    # 生成所有头像（输入未变的跳过）
+    manifest = RenderManifest.load(OUTPUT_DIR)
+    skipped = 0
     for name in AVATARS:
         output_path = os.path.join(OUTPUT_DIR, f"avatar_{name}.png")
+        key = render_key(name)
+        if manifest.fresh(output_path, key):
+            skipped += 1
+            continue
         generate_avatar(name, output_path)
+        manifest.record(output_path, key)
+    manifest.save()
     
-    print(f"\n✅ Success! Generated {len(AVATARS)} avatars in {OUTPUT_DIR}/")
+    print(f"\n✅ Success! Generated {len(AVATARS) - skipped} avatars in {OUTPUT_DIR}/ ({skipped} unchanged)")
     print("\n📋 Next steps:")
     print("1. Open Xcode and navigate to Assets.xcassets")
     print("2. For each PNG file in generated_avatars/:")
@@ -145,6 +163,7 @@ def main():
     print("   - Rename to match the filename (e.g., 'avatar_default')")
     print("   - Drag the PNG file into the 1x slot")
     print("3. Build and run your app!")
+    print("\n💡 Or write the imagesets directly: python3 batch_generate.py avatars --xcassets <path>/Assets.xcassets")
 
 if __name__ == "__main__":
     main()
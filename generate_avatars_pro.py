@@ -3,13 +3,19 @@
 生成专业美观的头像 - 渐变背景 + 图标风格
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import hashlib
 import os
-import math
+
+from gradients import radial_gradient
+from template_cache import circular_mask, round_gradient
+from fonts import load_font, text_font, EMOJI_FONT, HELVETICA_FONT
+from render_cache import RenderManifest, render_key as cache_key
+from png_optimize import save_png
 
 OUTPUT_DIR = "./generated_avatars_v2"
 AVATAR_SIZE = 300
+GENERATOR_VERSION = 1  # Bump when the drawing code changes, to invalidate the render cache
 
 # 配色方案 - 现代渐变色
 GRADIENT_COLORS = [
@@ -56,68 +62,44 @@ AVATARS = [
     {"name": "lightingpro", "emoji": "☀️", "gradient": 7}
 ]
 
-def hex_to_rgb(hex_color):
-    """Convert hex color to RGB tuple"""
-    hex_color = hex_color.lstrip('#')
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
 def create_radial_gradient(width, height, color1, color2):
     """Create radial gradient background"""
-    img = Image.new('RGB', (width, height))
-    draw = ImageDraw.Draw(img)
-    
-    r1, g1, b1 = hex_to_rgb(color1)
-    r2, g2, b2 = hex_to_rgb(color2)
-    
-    center_x, center_y = width // 2, height // 2
-    max_radius = math.sqrt(center_x**2 + center_y**2)
-    
-    for y in range(height):
-        for x in range(width):
-            # Calculate distance from center
-            dx = x - center_x
-            dy = y - center_y
-            distance = math.sqrt(dx*dx + dy*dy)
-            ratio = min(distance / max_radius, 1.0)
-            
-            # Interpolate color
-            r = int(r1 + (r2 - r1) * ratio)
-            g = int(g1 + (g2 - g1) * ratio)
-            b = int(b1 + (b2 - b1) * ratio)
-            
-            img.putpixel((x, y), (r, g, b))
-    
-    return img
+    return radial_gradient(width, height, color1, color2)
 
 def add_circular_mask(img):
     """Add circular mask to make avatar round"""
     size = img.size
-    mask = Image.new('L', size, 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse([0, 0, size[0], size[1]], fill=255)
+    mask = circular_mask(size)
     
     output = Image.new('RGBA', size, (255, 255, 255, 0))
     output.paste(img, (0, 0))
     output.putalpha(mask)
     return output
 
-def generate_avatar(config, output_path):
-    """Generate professional avatar with gradient and emoji"""
+def render_key(config):
+    """Render cache key: the config with its gradient colours resolved, size and fonts"""
+    resolved = dict(config, gradient=GRADIENT_COLORS[config["gradient"]])
+    return cache_key("generate_avatars_pro", GENERATOR_VERSION, resolved, (AVATAR_SIZE, AVATAR_SIZE),
+                     (EMOJI_FONT, HELVETICA_FONT))
+
+def render_avatar(config, scale=1):
+    """Render a professional avatar; scale > 1 renders a @2x/@3x master"""
+    size = AVATAR_SIZE * scale
     gradient = GRADIENT_COLORS[config["gradient"]]
     
-    # Create gradient background
-    img = create_radial_gradient(AVATAR_SIZE, AVATAR_SIZE, 
-                                 gradient["start"], gradient["end"])
+    # Round gradient background, rendered once per colour pair (see template_cache)
+    img = round_gradient(size, gradient["start"], gradient["end"])
     
-    # Add circular mask
-    img = add_circular_mask(img) # Try to add emoji
+    # Try to add emoji
     try:
         # Create a larger temporary image for emoji
-        emoji_img = Image.new('RGBA', (AVATAR_SIZE, AVATAR_SIZE), (0, 0, 0, 0))
+        emoji_img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
         draw = ImageDraw.Draw(emoji_img)
         
         # Try Apple Color Emoji font
-        font = ImageFont.truetype("/System/Library/Fonts/Apple Color Emoji.ttc", 150)
+        font = load_font(150 * scale, EMOJI_FONT)
+        if font is None:
+            raise OSError("Apple Color Emoji is not available")
         
         # Calculate position
         emoji = config["emoji"]
@@ -125,8 +107,8 @@ def generate_avatar(config, output_path):
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
-        text_x = (AVATAR_SIZE - text_width) // 2
-        text_y = (AVATAR_SIZE - text_height) // 2 - 10
+        text_x = (size - text_width) // 2
+        text_y = (size - text_height) // 2 - 10 * scale
         
         # Draw emoji
         draw.text((text_x, text_y), emoji, font=font, embedded_color=True)
@@ -137,23 +119,26 @@ def generate_avatar(config, output_path):
         print(f"  Note: Emoji rendering failed for {config['name']}, using text fallback")
         # Fallback: draw text
         draw = ImageDraw.Draw(img)
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 80)
-        except:
-            font = ImageFont.load_default()
+        font = text_font(80 * scale, HELVETICA_FONT)
         
         text = config["name"][:2].upper()
         bbox = draw.textbbox((0, 0), text, font=font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
-        text_x = (AVATAR_SIZE - text_width) // 2
-        text_y = (AVATAR_SIZE - text_height) // 2
+        text_x = (size - text_width) // 2
+        text_y = (size - text_height) // 2
         
         draw.text((text_x, text_y), text, fill=(255, 255, 255, 230), font=font)
     
+    return img
+
+def generate_avatar(config, output_path):
+    """Generate professional avatar with gradient and emoji"""
+    img = render_avatar(config)
+    
     # Save
-    img.save(output_path, 'PNG')
+    save_png(img, output_path)
     print(f"✓ {config['name']}")
 
 def main():
@@ -162,11 +147,19 @@ def main():
     print("🎨 Generating Professional Avatars (v2)...")
     print(f"📁 Output: {OUTPUT_DIR}/\n")
     
+    manifest = RenderManifest.load(OUTPUT_DIR)
+    skipped = 0
     for config in AVATARS:
         output_path = os.path.join(OUTPUT_DIR, f"avatar_{config['name']}.png")
+        key = render_key(config)
+        if manifest.fresh(output_path, key):
+            skipped += 1
+            continue
         generate_avatar(config, output_path)
+        manifest.record(output_path, key)
+    manifest.save()
     
-    print(f"\n✅ Generated {len(AVATARS)} professional avatars!")
+    print(f"\n✅ Generated {len(AVATARS) - skipped} professional avatars ({skipped} unchanged)!")
     print(f"📂 Location: {OUTPUT_DIR}/")
 
 if __name__ == "__main__":
@@ -4,13 +4,19 @@
 生成爬行动物主题的渐变占位图
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw
 import os
 
+from gradients import vertical_gradient
+from fonts import load_font, text_font, EMOJI_FONT, HELVETICA_FONT
+from render_cache import RenderManifest, render_key as cache_key
+from png_optimize import save_png
+
 # 配置
 OUTPUT_DIR = "./generated_avatars"
 IMAGE_WIDTH = 400
 IMAGE_HEIGHT = 600
+GENERATOR_VERSION = 1  # 绘制代码改动时加一，让渲染缓存失效
 
 # 占位图配置
 PLACEHOLDERS = [
@@ -21,27 +27,19 @@ PLACEHOLDERS = [
 
 def create_gradient(width, height, color1, color2):
     """创建垂直渐变"""
-    base = Image.new('RGB', (width, height), color1)
-    draw = ImageDraw.Draw(base)
-    
-    # 将颜色字符串转换为RGB
-    r1, g1, b1 = tuple(int(color1[i:i+2], 16) for i in (1, 3, 5))
-    r2, g2, b2 = tuple(int(color2[i:i+2], 16) for i in (1, 3, 5))
-    
-    # 绘制渐变
-    for y in range(height):
-        ratio = y / height
-        r = int(r1 + (r2 - r1) * ratio)
-        g = int(g1 + (g2 - g1) * ratio)
-        b = int(b1 + (b2 - b1) * ratio)
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
-    
-    return base
+    return vertical_gradient(width, height, [color1, color2])
 
-def generate_placeholder(config, output_path):
-    """生成占位图"""
+def render_key(config):
+    """渲染缓存键：配置、尺寸和字体都参与哈希"""
+    return cache_key("generate_placeholders", GENERATOR_VERSION, config, (IMAGE_WIDTH, IMAGE_HEIGHT),
+                     (EMOJI_FONT, HELVETICA_FONT))
+
+def render_placeholder(config, scale=1):
+    """渲染占位图，scale 为倍率（xcassets 的 @3x 母版用 scale=3）"""
+    width, height = IMAGE_WIDTH * scale, IMAGE_HEIGHT * scale
+    
     # 创建渐变背景
-    img = create_gradient(IMAGE_WIDTH, IMAGE_HEIGHT, config["colors"][0], config["colors"][1])
+    img = create_gradient(width, height, config["colors"][0], config["colors"][1])
     draw = ImageDraw.Draw(img)
     
     # 添加emoji（如果支持）
@@ -49,36 +47,41 @@ def generate_placeholder(config, output_path):
     
     # 尝试使用大字体绘制emoji
     try:
-        font = ImageFont.truetype("/System/Library/Fonts/Apple Color Emoji.ttc", 120)
+        font = load_font(120 * scale, EMOJI_FONT)
+        if font is None:
+            raise OSError("Apple Color Emoji is not available")
         
         # 计算居中位置
         bbox = draw.textbbox((0, 0), emoji, font=font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
-        text_x = (IMAGE_WIDTH - text_width) // 2
-        text_y = (IMAGE_HEIGHT - text_height) // 2
+        text_x = (width - text_width) // 2
+        text_y = (height - text_height) // 2
         
         draw.text((text_x, text_y), emoji, font=font, embedded_color=True)
     except:
         # 如果失败，绘制简单文字
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 80)
-        except:
-            font = ImageFont.load_default()
+        font = text_font(80 * scale, HELVETICA_FONT)
         
         text = "REPTILE"
         bbox = draw.textbbox((0, 0), text, font=font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
-        text_x = (IMAGE_WIDTH - text_width) // 2
-        text_y = (IMAGE_HEIGHT - text_height) // 2
+        text_x = (width - text_width) // 2
+        text_y = (height - text_height) // 2
         
         draw.text((text_x, text_y), text, fill='white', font=font)
     
+    return img
+
+def generate_placeholder(config, output_path):
+    """生成占位图"""
+    img = render_placeholder(config)
+    
     # 保存图片
-    img.save(output_path, 'PNG')
+    save_png(img, output_path)
     print(f"✓ Generated: {output_path}")
 
 def main():
@@ -91,12 +94,20 @@ def main():
     print(f"📐 Image size: {IMAGE_WIDTH}x{IMAGE_HEIGHT}")
     print(f"📝 Total placeholders to generate: {len(PLACEHOLDERS)}\n")
     
-    # 生成所有占位图
+    # 生成所有占位图（输入未变的跳过）
+    manifest = RenderManifest.load(OUTPUT_DIR)
+    skipped = 0
     for config in PLACEHOLDERS:
         output_path = os.path.join(OUTPUT_DIR, f"{config['name']}.png")
+        key = render_key(config)
+        if manifest.fresh(output_path, key):
+            skipped += 1
+            continue
         generate_placeholder(config, output_path)
+        manifest.record(output_path, key)
+    manifest.save()
     
-    print(f"\n✅ Success! Generated {len(PLACEHOLDERS)} placeholders in {OUTPUT_DIR}/")
+    print(f"\n✅ Success! Generated {len(PLACEHOLDERS) - skipped} placeholders in {OUTPUT_DIR}/ ({skipped} unchanged)")
 
 if __name__ == "__main__":
     main()
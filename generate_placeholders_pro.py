@@ -3,13 +3,19 @@
 生成专业美观的爬行动物占位图 - 使用真实感渐变和纹理
 """
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw, ImageFilter
 import os
 import random
 
+from gradients import vertical_gradient
+from fonts import load_font, text_font, EMOJI_FONT, SF_PRO_BOLD_FONT, HELVETICA_FONT
+from render_cache import RenderManifest, render_key as cache_key
+from png_optimize import save_png
+
 OUTPUT_DIR = "./generated_avatars_v2"
 IMAGE_WIDTH = 400
 IMAGE_HEIGHT = 600
+GENERATOR_VERSION = 1  # Bump when the drawing code changes, to invalidate the render cache
 
 # 专业配色方案 (Cosplay/Photography/Fashion)
 PLACEHOLDER_CONFIGS = [
@@ -36,58 +42,42 @@ PLACEHOLDER_CONFIGS = [
     },
 ]
 
-def hex_to_rgb(hex_color):
-    hex_color = hex_color.lstrip('#')
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
 def create_multi_gradient(width, height, colors):
     """Create smooth multi-color gradient"""
-    img = Image.new('RGB', (width, height))
-    draw = ImageDraw.Draw(img)
-    
-    num_colors = len(colors)
-    segment_height = height // (num_colors - 1)
-    
-    for segment in range(num_colors - 1):
-        r1, g1, b1 = hex_to_rgb(colors[segment])
-        r2, g2, b2 = hex_to_rgb(colors[segment + 1])
-        
-        start_y = segment * segment_height
-        end_y = (segment + 1) * segment_height
-        
-        for y in range(start_y, min(end_y, height)):
-            ratio = (y - start_y) / segment_height
-            r = int(r1 + (r2 - r1) * ratio)
-            g = int(g1 + (g2 - g1) * ratio)
-            b = int(b1 + (b2 - b1) * ratio)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-    
-    return img
+    return vertical_gradient(width, height, colors)
 
-def add_texture_pattern(img, pattern_type="scales"):
+def add_texture_pattern(img, pattern_type="scales", scale=1):
     """Add subtle texture pattern"""
     overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
     draw = ImageDraw.Draw(overlay)
     
     if pattern_type == "scales":
         # Draw subtle scale pattern
-        for y in range(0, img.height, 40):
-            for x in range(0, img.width, 40):
+        step, radius = 40 * scale, 15 * scale
+        for y in range(0, img.height, step):
+            for x in range(0, img.width, step):
                 # Hexagonal scale pattern
-                offset = 20 if (y // 40) % 2 else 0
-                draw.ellipse([x + offset - 15, y - 15, x + offset + 15, y + 15], 
-                           outline=(255, 255, 255, 30), width=2)
+                offset = step // 2 if (y // step) % 2 else 0
+                draw.ellipse([x + offset - radius, y - radius, x + offset + radius, y + radius], 
+                           outline=(255, 255, 255, 30), width=2 * scale)
     
     return Image.alpha_composite(img.convert('RGBA'), overlay)
 
-def generate_placeholder(config, output_path):
-    """Generate professional placeholder image"""
+def render_key(config):
+    """Render cache key: config, size and fonts"""
+    return cache_key("generate_placeholders_pro", GENERATOR_VERSION, config, (IMAGE_WIDTH, IMAGE_HEIGHT),
+                     (EMOJI_FONT, SF_PRO_BOLD_FONT, HELVETICA_FONT))
+
+def render_placeholder(config, scale=1):
+    """Render a professional placeholder; scale > 1 renders a @2x/@3x master"""
+    width, height = IMAGE_WIDTH * scale, IMAGE_HEIGHT * scale
+    
     # Create gradient
-    img = create_multi_gradient(IMAGE_WIDTH, IMAGE_HEIGHT, config["colors"])
+    img = create_multi_gradient(width, height, config["colors"])
     
     # Add subtle texture
     if config.get("pattern") == "scales":
-        img = add_texture_pattern(img, "scales")
+        img = add_texture_pattern(img, "scales", scale)
     else:
         img = img.convert('RGBA')
     
@@ -101,34 +91,31 @@ def generate_placeholder(config, output_path):
     
     # Add emoji (large, centered)
     try:
-        font_emoji = ImageFont.truetype("/System/Library/Fonts/Apple Color Emoji.ttc", 120)
+        font_emoji = load_font(120 * scale, EMOJI_FONT)
+        if font_emoji is None:
+            raise OSError("Apple Color Emoji is not available")
         emoji = config["emoji"]
         bbox = draw.textbbox((0, 0), emoji, font=font_emoji)
         emoji_width = bbox[2] - bbox[0]
-        emoji_x = (IMAGE_WIDTH - emoji_width) // 2
-        emoji_y = IMAGE_HEIGHT // 2 - 100
+        emoji_x = (width - emoji_width) // 2
+        emoji_y = height // 2 - 100 * scale
         
         draw.text((emoji_x, emoji_y), emoji, font=font_emoji, embedded_color=True)
     except:
         pass
     
     # Add title text
-    try:
-        font_title = ImageFont.truetype("/System/Library/Fonts/SF-Pro-Display-Bold.otf", 48)
-    except:
-        try:
-            font_title = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 48)
-        except:
-            font_title = ImageFont.load_default()
+    font_title = text_font(48 * scale, SF_PRO_BOLD_FONT, HELVETICA_FONT)
     
     title = config["title"]
     bbox = draw.textbbox((0, 0), title, font=font_title)
     title_width = bbox[2] - bbox[0]
-    title_x = (IMAGE_WIDTH - title_width) // 2
-    title_y = IMAGE_HEIGHT // 2 + 60
+    title_x = (width - title_width) // 2
+    title_y = height // 2 + 60 * scale
     
     # Add text shadow
-    draw.text((title_x + 2, title_y + 2), title, fill=(0, 0, 0, 80), font=font_title)
+    shadow = 2 * scale
+    draw.text((title_x + shadow, title_y + shadow), title, fill=(0, 0, 0, 80), font=font_title)
     # Main text
     draw.text((title_x, title_y), title, fill=(255, 255, 255, 250), font=font_title)
     
@@ -136,10 +123,14 @@ def generate_placeholder(config, output_path):
     img = Image.alpha_composite(img, overlay)
     
     # Apply subtle blur for professional look
-    img = img.filter(ImageFilter.SMOOTH)
+    return img.filter(ImageFilter.SMOOTH)
+
+def generate_placeholder(config, output_path):
+    """Generate professional placeholder image"""
+    img = render_placeholder(config)
     
     # Save
-    img.save(output_path, 'PNG', quality=95)
+    save_png(img, output_path)
     print(f"✓ {config['name']}")
 
 def main():
@@ -148,11 +139,19 @@ def main():
     print("🖼️  Generating Professional Placeholders (v2)...")
     print(f"📁 Output: {OUTPUT_DIR}/\n")
     
+    manifest = RenderManifest.load(OUTPUT_DIR)
+    skipped = 0
     for config in PLACEHOLDER_CONFIGS:
         output_path = os.path.join(OUTPUT_DIR, f"{config['name']}.png")
+        key = render_key(config)
+        if manifest.fresh(output_path, key):
+            skipped += 1
+            continue
         generate_placeholder(config, output_path)
+        manifest.record(output_path, key)
+    manifest.save()
     
-    print(f"\n✅ Generated {len(PLACEHOLDER_CONFIGS)} professional placeholders!")
+    print(f"\n✅ Generated {len(PLACEHOLDER_CONFIGS) - skipped} professional placeholders ({skipped} unchanged)!")
     print(f"📂 Location: {OUTPUT_DIR}/")
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+渐变背景渲染 - NumPy 向量化实现
+Shared by generate_avatars_pro.py, generate_placeholders.py and generate_placeholders_pro.py.
+
+The whole distance field / colour ramp is computed as array operations and the
+image is created with a single Image.fromarray. The float math mirrors the old
+per-pixel loops step by step, so the output is pixel-identical to them.
+"""
+
+import math
+
+import numpy as np
+from PIL import Image
+
+def hex_to_rgb(hex_color):
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def interpolate(color1, color2, ratio):
+    """Colour at ratio (array of floats in [0, 1]) between two hex colours, as uint8 RGB."""
+    start = np.array(hex_to_rgb(color1), dtype=np.float64)
+    delta = np.array(hex_to_rgb(color2), dtype=np.float64) - start
+    # Same order as int(c1 + (c2 - c1) * ratio); every value is >= 0, so truncation is int()
+    return (start + delta * ratio[..., np.newaxis]).astype(np.uint8)
+
+def radial_gradient(width, height, color1, color2):
+    """Radial gradient from color1 at the centre to color2 at the corners."""
+    center_x, center_y = width // 2, height // 2
+    max_radius = math.sqrt(center_x**2 + center_y**2)
+
+    dx = np.arange(width, dtype=np.int64) - center_x
+    dy = np.arange(height, dtype=np.int64) - center_y
+    distance = np.sqrt(dx[np.newaxis, :] * dx[np.newaxis, :] + dy[:, np.newaxis] * dy[:, np.newaxis])
+    ratio = np.minimum(distance / max_radius, 1.0)
+
+    return Image.fromarray(interpolate(color1, color2, ratio))
+
+def vertical_gradient(width, height, colors):
+    """Top-to-bottom gradient through colors, split into equal segments.
+
+    Each segment is height // (len(colors) - 1) rows tall; rows left over below
+    the last segment stay black, exactly as the row-by-row renderers drew them.
+    """
+    rows = np.zeros((height, 3), dtype=np.uint8)
+    segment_height = height // (len(colors) - 1)
+
+    for segment in range(len(colors) - 1):
+        start_y = segment * segment_height
+        end_y = min((segment + 1) * segment_height, height)
+        if start_y >= end_y:
+            continue
+        ratio = (np.arange(start_y, end_y, dtype=np.int64) - start_y) / segment_height
+        rows[start_y:end_y] = interpolate(colors[segment], colors[segment + 1], ratio)
+
+    # Render one column and stretch it sideways in C instead of materialising every row in NumPy
+    return Image.fromarray(rows[:, np.newaxis, :]).resize((width, height), Image.NEAREST)
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Obfuscation Map Store
+---------------------
+Usage:
+    python3 map_store.py import <map_json> <store>
+    python3 map_store.py export <store> [<map_json>]
+    python3 map_store.py compact <store>
+    python3 map_store.py stats <store>
+
+Arguments:
+    map_json   JSON mapping as written by swift_obfuscate.py ({"original": "obfuscated"});
+               export writes to stdout when omitted
+    store      Compact map store (*.oxmap), used by swift_obfuscate.py --map-file STORE
+
+Examples:
+    python3 map_store.py import obfuscation_map.json portfolio.oxmap
+    python3 swift_obfuscate.py ./wldo --map-file portfolio.oxmap
+    python3 map_store.py export portfolio.oxmap obfuscation_map.json
+
+A store is one immutable file plus an append-only log beside it
+(portfolio.oxmap.log). The file holds the originals sorted and
+prefix-compressed in blocks of BLOCK_SIZE entries, each with its obfuscated
+name, then the obfuscated names sorted the same way, then the offset of
+every block. It is memory-mapped: a lookup binary-searches the block
+offsets and decodes one block, so a run touches only the entries of the
+names in its tree, whatever the size of the map. New entries are appended
+to the log as JSON lines; once the log outgrows a fraction of the file, both
+are merged into a new file (compaction).
+
+Runs that share a map (swift_obfuscate.py --shared) serialize their writes
+with map_lock(), an flock on <map>.lock, and reload the store under it.
+"""
+
+import os
+import sys
+import json
+import mmap
+import fcntl
+import struct
+import argparse
+from contextlib import contextmanager
+from collections.abc import Mapping
+
+STORE_SUFFIX = ".oxmap"
+LOG_SUFFIX = ".log"
+LOCK_SUFFIX = ".lock"
+MAGIC = b"OXMAP1\0\0"
+# magic, entries, blocks of originals, blocks of obfuscated names, block size, index offset
+HEADER = struct.Struct("<8sQQQIQ")
+OFFSET = struct.Struct("<Q")
+BLOCK_SIZE = 16
+# Compact when the log holds more than this many entries, or a tenth of the file's
+COMPACT_MIN = 4096
+COMPACT_FRACTION = 10
+
+@contextmanager
+def map_lock(map_file, exclusive=True):
+    """flock on <map_file>.lock, for runs sharing one map (JSON or store).
+
+    Writers take it exclusively around reload + merge + write; readers of a
+    store take it shared while opening, so a compaction cannot remove the log
+    between reading the file and reading the log.
+    """
+    with open(map_file + LOCK_SUFFIX, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def save_map(map_file, mapping):
+    """Write a JSON map atomically, in the format swift_obfuscate.py writes it"""
+    tmp = map_file + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(mapping, f, indent=2, sort_keys=True)
+    os.replace(tmp, map_file)
+
+def load_map(map_file):
+    """{original: obfuscated} of a JSON map, or every entry of a map store"""
+    if is_store(map_file):
+        with MapStore(map_file) as store:
+            return dict(store.items())
+    with open(map_file, 'r') as f:
+        return json.load(f)
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(buffer, pos):
+    value = shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def shared_prefix(a, b):
+    limit = min(len(a), len(b))
+    n = 0
+    while n < limit and a[n] == b[n]:
+        n += 1
+    return n
+
+def encode_blocks(keys, values=None):
+    """Prefix-compressed blocks of sorted keys (each followed by its value if given).
+
+    Returns (data, block offsets relative to data).
+    """
+    data = bytearray()
+    offsets = []
+    previous = b''
+    for i, key in enumerate(keys):
+        if i % BLOCK_SIZE == 0:
+            offsets.append(len(data))
+            previous = b''
+        shared = shared_prefix(previous, key)
+        write_varint(data, shared)
+        write_varint(data, len(key) - shared)
+        data += key[shared:]
+        if values is not None:
+            write_varint(data, len(values[i]))
+            data += values[i]
+        previous = key
+    return data, offsets
+
+def write_store(path, items):
+    """Write a store file from (original, obfuscated) str pairs, atomically"""
+    pairs = sorted((key.encode('utf-8'), value.encode('utf-8')) for key, value in items)
+    keys = [key for key, _ in pairs]
+    key_data, key_offsets = encode_blocks(keys, [value for _, value in pairs])
+    value_data, value_offsets = encode_blocks(sorted(value for _, value in pairs))
+    base = HEADER.size
+    index_offset = base + len(key_data) + len(value_data)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(pairs), len(key_offsets), len(value_offsets), BLOCK_SIZE, index_offset))
+        f.write(key_data)
+        f.write(value_data)
+        f.write(b''.join(OFFSET.pack(base + offset) for offset in key_offsets))
+        f.write(b''.join(OFFSET.pack(base + len(key_data) + offset) for offset in value_offsets))
+    os.replace(tmp, path)
+
+class SortedBlocks:
+    """Read side of encode_blocks over a memory map."""
+
+    def __init__(self, buffer, index_offset, blocks, end, with_values):
+        self.buffer = buffer
+        self.index_offset = index_offset
+        self.blocks = blocks
+        self.end = end
+        self.with_values = with_values
+
+    def block_offset(self, i):
+        return OFFSET.unpack_from(self.buffer, self.index_offset + 8 * i)[0]
+
+    def first_key(self, i):
+        pos = self.block_offset(i) + 1   # shared length of a block's first key is always 0
+        length, pos = read_varint(self.buffer, pos)
+        return self.buffer[pos:pos + length]
+
+    def iter_block(self, i):
+        """(key, value or None) of every entry of block i"""
+        buffer = self.buffer
+        pos = self.block_offset(i)
+        end = self.block_offset(i + 1) if i + 1 < self.blocks else self.end
+        key = b''
+        while pos < end:
+            shared, pos = read_varint(buffer, pos)
+            length, pos = read_varint(buffer, pos)
+            key = key[:shared] + buffer[pos:pos + length]
+            pos += length
+            value = None
+            if self.with_values:
+                length, pos = read_varint(buffer, pos)
+                value = buffer[pos:pos + length]
+                pos += length
+            yield key, value
+
+    def find(self, key):
+        """(True, value) if key is present, else (False, None)"""
+        low, high = 0, self.blocks - 1
+        if high < 0 or key < self.first_key(0):
+            return False, None
+        # Last block whose first key is <= key
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.first_key(middle) <= key:
+                low = middle
+            else:
+                high = middle - 1
+        for found, value in self.iter_block(low):
+            if found == key:
+                return True, value
+            if found > key:
+                break
+        return False, None
+
+    def __iter__(self):
+        for i in range(self.blocks):
+            yield from self.iter_block(i)
+
+class ObfuscatedNames:
+    """Membership view of a store's obfuscated names (build_mapping's taken)"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __contains__(self, name):
+        return self.store.has_value(name)
+
+class MapStore(Mapping):
+    """original -> obfuscated map backed by a store file and its log."""
+
+    def __init__(self, path):
+        self.path = path
+        self.log_path = path + LOG_SUFFIX
+        self.obfuscated = ObfuscatedNames(self)
+        self._file = self._map = None
+        self.count = 0
+        self.keys_section = self.values_section = None
+        self._open()
+        self.log = {}
+        self.log_values = set()
+        self._read_log()
+
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, key_blocks, value_blocks, block_size, index_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"'{self.path}' is not an obfuscation map store")
+        self.count = count
+        value_start = OFFSET.unpack_from(self._map, index_offset + 8 * key_blocks)[0] if value_blocks else index_offset
+        self.keys_section = SortedBlocks(self._map, index_offset, key_blocks, value_start, True)
+        self.values_section = SortedBlocks(self._map, index_offset + 8 * key_blocks, value_blocks, index_offset, False)
+
+    def _read_log(self):
+        try:
+            f = open(self.log_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    original, obfuscated = json.loads(line)
+                except ValueError:
+                    # A line cut short by an interrupted append
+                    continue
+                self.log[original] = obfuscated
+                self.log_values.add(obfuscated)
+
+    def reload(self):
+        """Pick up what other runs wrote since the store was opened"""
+        self.close()
+        self._open()
+        self.log = {}
+        self.log_values = set()
+        self._read_log()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+            self.keys_section = self.values_section = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ─── Lookups ─────────────────────────────────────────────────────────────
+
+    def get(self, name, default=None):
+        if name in self.log:
+            return self.log[name]
+        if self.keys_section is not None:
+            found, value = self.keys_section.find(name.encode('utf-8'))
+            if found:
+                return value.decode('utf-8')
+        return default
+
+    def __getitem__(self, name):
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def has_value(self, name):
+        """Whether name is the obfuscated name of some entry"""
+        if name in self.log_values:
+            return True
+        return self.values_section is not None and self.values_section.find(name.encode('utf-8'))[0]
+
+    def lookup(self, names):
+        """{name: obfuscated} for the names that are mapped"""
+        found = {}
+        for name in names:
+            value = self.get(name)
+            if value is not None:
+                found[name] = value
+        return found
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    def items(self):
+        """Every entry in sorted order: the file merged with the log"""
+        pending = sorted(self.log.items())
+        i = 0
+        if self.keys_section is not None:
+            for key, value in self.keys_section:
+                key = key.decode('utf-8')
+                while i < len(pending) and pending[i][0] < key:
+                    yield pending[i]
+                    i += 1
+                if i < len(pending) and pending[i][0] == key:
+                    continue
+                yield key, value.decode('utf-8')
+        yield from pending[i:]
+
+    def __len__(self):
+        if self.keys_section is None:
+            return len(self.log)
+        return self.count + sum(1 for name in self.log if not self.keys_section.find(name.encode('utf-8'))[0])
+
+    # ─── Updates ─────────────────────────────────────────────────────────────
+
+    def add(self, entries):
+        """Append new entries to the log, compacting when it has grown large"""
+        entries = {name: value for name, value in entries.items() if self.get(name) != value}
+        if not entries:
+            return
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            for name, value in sorted(entries.items()):
+                f.write(json.dumps([name, value]) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.log.update(entries)
+        self.log_values.update(entries.values())
+        # A new store gets its file right away
+        if self.keys_section is None or len(self.log) > max(COMPACT_MIN, self.count // COMPACT_FRACTION):
+            self.compact()
+
+    def compact(self):
+        """Merge the log into a new store file and empty the log"""
+        if not self.log and self.keys_section is not None:
+            return
+        items = list(self.items())
+        self.close()
+        write_store(self.path, items)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self.log = {}
+        self.log_values = set()
+        self._open()
+
+    @classmethod
+    def from_json(cls, json_path, path):
+        """Create (or replace) a store holding exactly the entries of a JSON map"""
+        with open(json_path, 'r') as f:
+            mapping = json.load(f)
+        write_store(path, mapping.items())
+        if os.path.exists(path + LOG_SUFFIX):
+            os.remove(path + LOG_SUFFIX)
+        return cls(path)
+
+    def to_json(self, out):
+        """Write the map in swift_obfuscate.py's JSON format"""
+        json.dump(dict(self.items()), out, indent=2, sort_keys=True)
+
+def is_store(map_file):
+    return map_file.endswith(STORE_SUFFIX)
+
+def main():
+    parser = argparse.ArgumentParser(description="Obfuscation Map Store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Create a store from a JSON map")
+    import_parser.add_argument("map_json")
+    import_parser.add_argument("store")
+    export_parser = commands.add_parser("export", help="Write a store as a JSON map")
+    export_parser.add_argument("store")
+    export_parser.add_argument("map_json", nargs="?", default=None)
+    commands.add_parser("compact", help="Merge the log into the store file").add_argument("store")
+    commands.add_parser("stats", help="Show the size of a store").add_argument("store")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "import":
+            with MapStore.from_json(args.map_json, args.store) as store:
+                print(f"✅ Imported {len(store):,} entries → {args.store} ({os.path.getsize(args.store) / 1024:.0f} KB)")
+            return
+        if not os.path.exists(args.store) and not os.path.exists(args.store + LOG_SUFFIX):
+            print(f"❌ Error: '{args.store}' does not exist.")
+            sys.exit(1)
+        with MapStore(args.store) as store:
+            if args.command == "export":
+                if args.map_json:
+                    with open(args.map_json, 'w') as f:
+                        store.to_json(f)
+                    print(f"✅ Exported {len(store):,} entries → {args.map_json}")
+                else:
+                    store.to_json(sys.stdout)
+                    print()
+            elif args.command == "compact":
+                pending = len(store.log)
+                store.compact()
+                print(f"✅ Compacted {pending} logged entries; {len(store):,} entries in {args.store}")
+            else:
+                print(f"📦 {args.store}: {len(store):,} entries "
+                      f"({store.count:,} in the file, {len(store.log):,} in the log), "
+                      f"{os.path.getsize(args.store) / 1024:.0f} KB")
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
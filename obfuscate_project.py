@@ -1,12 +1,46 @@
+#!/usr/bin/env python3
+"""
+Project Class-Prefix Renamer
+----------------------------
+Usage:
+    python3 obfuscate_project.py <root_directory> [--mappings MAP_JSON] [--old-prefix OLD] [--new-prefix NEW] [--exclude PATTERN] [--project PBXPROJ]
+
+Arguments:
+    root_directory   Project directory whose files are rewritten and renamed
+    --mappings       JSON object of specific renames {"OldName": "NewName"} (default: CLASS_MAPPINGS)
+    --old-prefix     Class prefix to replace (default: 'WLD')
+    --new-prefix     Replacement class prefix (default: 'WLD')
+    --exclude        Directory name pattern never descended into; repeatable (default: Pods, .git, build)
+    --project        Extra .xcodeproj (or project.pbxproj) outside root_directory to keep in step
+                     with the renames; repeatable. Projects inside root_directory are found automatically.
+
+Examples:
+    python3 obfuscate_project.py ./wldo
+    python3 obfuscate_project.py ./wldo --mappings ./class_map.json --old-prefix WLD --new-prefix KNO
+    python3 obfuscate_project.py ./wldo --old-prefix WLD --new-prefix KNO --project ./keno.xcodeproj
+
+project.pbxproj files are not text-rewritten: each is parsed once (pbxproj.py),
+the file and group renames are applied to its object graph and it is written
+back once, so paths, names and comments follow the files on disk.
+"""
+
 import os
+import re
+import sys
+import json
+import fnmatch
+import shutil
+import argparse
+import tempfile
+
+from pbxproj import PBXProject, renamed_path
 
 # Configuration
-ROOT_DIR = '/Users/lizhicong/Desktop/海外/Keno/源码/wldo'
 OLD_PREFIX = 'WLD'
 NEW_PREFIX = 'WLD'
 
 # Specific Mappings (Old -> New)
-# These will be applied first, before generic prefix replacement
+# These take precedence over the generic prefix replacement
 CLASS_MAPPINGS = {
     'WLDAuthService': 'WLDAuthService',
     'WLDChatHandler': 'WLDChatHandler',
@@ -23,92 +57,283 @@ CLASS_MAPPINGS = {
     'wldo': 'wldo', # Project name replacement if needed, but risky for entitlement/bundle id. let's stick to safe class renames first.
 }
 
-# generic replacement for other WLD* classes
-# We will do this by looking for 'WLD' followed by an uppercase letter
+# Directory names (fnmatch patterns) that are never descended into
+DEFAULT_EXCLUDES = ('Pods', '.git', 'build')
+
+# Text files are streamed in chunks of this size; binaries are detected from the first SNIFF_SIZE bytes
+CHUNK_SIZE = 1024 * 1024
+SNIFF_SIZE = 8192
+
+# Magic numbers of the binary formats found in the project (images, video, binary plists, archives)
+BINARY_SIGNATURES = (b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'bplist', b'PK\x03\x04', b'%PDF')
+
+# Bytes that continue an identifier; non-ASCII bytes belong to UTF-8 identifier characters
+IDENTIFIER_BYTES = rb'[A-Za-z0-9_\x80-\xff]'
+
+def is_binary(header):
+    """Guess from the first bytes of a file whether it is binary."""
+    if b'\0' in header or header.startswith(BINARY_SIGNATURES):
+        return True
+    # MP4 / MOV / HEIC: a box size followed by 'ftyp'
+    return header[4:8] == b'ftyp'
+
+def trie_pattern(keys):
+    """Regex source matching any of keys, compiled from a trie so each byte follows one branch."""
+    trie = {}
+    for key in keys:
+        node = trie
+        for byte in key:
+            node = node.setdefault(byte, {})
+        node[None] = True
+
+    def emit(node):
+        branches = [re.escape(bytes([byte])) + emit(node[byte]) for byte in sorted(b for b in node if b is not None)]
+        if not branches:
+            return b''
+        body = branches[0] if len(branches) == 1 else b'(?:' + b'|'.join(branches) + b')'
+        if None in node:
+            # Greedy optional: the longest key through this node is tried first
+            return b'(?:' + body + b')?'
+        return body
+
+    return emit(trie)
+
+class RenameEngine:
+    """Every rebrand rule compiled into one bytes pattern applied in a single pass.
+
+    Specific mappings replace whole identifiers only; the generic prefix is
+    replaced where it starts an identifier. Working on bytes keeps every file's
+    encoding intact.
+    """
+
+    def __init__(self, mappings, old_prefix, new_prefix):
+        self.mappings = dict(mappings)
+        self.old_prefix = old_prefix
+        self.new_prefix = new_prefix
+        self.replacements = {old.encode('utf-8'): new.encode('utf-8') for old, new in self.mappings.items() if old}
+        self.prefix = old_prefix.encode('utf-8')
+        self.new_prefix_bytes = new_prefix.encode('utf-8')
+
+        alternatives = []
+        if self.replacements:
+            alternatives.append(b'(?P<exact>' + trie_pattern(self.replacements) + b')(?!' + IDENTIFIER_BYTES + b')')
+        if self.prefix:
+            alternatives.append(b'(?P<prefix>' + re.escape(self.prefix) + b')')
+        self.pattern = re.compile(b'(?<!' + IDENTIFIER_BYTES + b')(?:' + b'|'.join(alternatives) + b')') if alternatives else None
+        # A match starting this far before the end of a chunk is complete, lookahead included
+        self.overlap = max([len(key) for key in self.replacements] + [len(self.prefix)])
+
+    def rename(self, name):
+        """New name for a whole identifier, file stem or directory name."""
+        if name in self.mappings:
+            return self.mappings[name]
+        if self.old_prefix and name.startswith(self.old_prefix):
+            return self.new_prefix + name[len(self.old_prefix):]
+        return name
+
+    def rewrite(self, buffer, start, limit):
+        """Rewrite buffer[start:] up to limit; buffer[:start] is context only.
+
+        Returns (pieces, end, changed); buffer[end:] is left for the next chunk.
+        """
+        pieces, pos, changed = [], start, False
+        if self.pattern is not None:
+            for match in self.pattern.finditer(buffer, start):
+                if match.start() >= limit:
+                    break
+                old = match.group()
+                new = self.replacements[old] if match.lastgroup == 'exact' else self.new_prefix_bytes
+                pieces.append(buffer[pos:match.start()])
+                pieces.append(new)
+                changed = changed or new != old
+                pos = match.end()
+        end = max(pos, limit)
+        pieces.append(buffer[pos:end])
+        return pieces, end, changed
+
+def build_engine(mappings=None, old_prefix=OLD_PREFIX, new_prefix=NEW_PREFIX):
+    return RenameEngine(CLASS_MAPPINGS if mappings is None else mappings, old_prefix, new_prefix)
+
+def load_mappings(path):
+    """Load specific renames from a JSON object of {"OldName": "NewName"}."""
+    with open(path, 'r', encoding='utf-8') as f:
+        mappings = json.load(f)
+    if not isinstance(mappings, dict):
+        raise ValueError(f"{path}: expected a JSON object of old -> new names")
+    return mappings
+
+def copy_prefix(file_path, out, length):
+    """Copy the first length bytes of file_path to out."""
+    with open(file_path, 'rb') as src:
+        while length > 0:
+            data = src.read(min(length, CHUNK_SIZE))
+            if not data:
+                break
+            out.write(data)
+            length -= len(data)
 
-def replace_text_in_file(file_path):
+def replace_text_in_file(file_path, engine=None, chunk_size=CHUNK_SIZE):
+    """Stream a text file through the rename engine and swap it in atomically if it changed.
+
+    Binary files are skipped from a header sniff. Memory stays bounded by
+    chunk_size, and nothing is written until the first real replacement.
+    """
+    engine = engine or build_engine()
+    out = None
+    clean = 0  # leading input bytes known to be unchanged while out is None
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except UnicodeDecodeError:
-        try:
-             with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        except:
-            print(f"Skipping binary or unreadable file: {file_path}")
-            return
-
-    new_content = content
-    
-    # 1. Apply specific mappings
-    for old, new in CLASS_MAPPINGS.items():
-        new_content = new_content.replace(old, new)
-    
-    # 2. Apply generic prefix replacement
-    # Be careful not to replace substrings indiscriminately, but 'WLD' is quite specific as a prefix in this context.
-    # To be safer, we can just do a simple replace since we are renaming the prefix.
-    # However, strict prefix replacement is 'WLD' -> 'WLD'
-    new_content = new_content.replace(OLD_PREFIX, NEW_PREFIX)
-
-    if new_content != content:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        with open(file_path, 'rb') as src:
+            buffer = src.read(SNIFF_SIZE)
+            if is_binary(buffer):
+                return
+            start = 0
+            while True:
+                chunk = src.read(chunk_size)
+                buffer += chunk
+                limit = len(buffer) - engine.overlap if chunk else len(buffer)
+                pieces, end, changed = engine.rewrite(buffer, start, limit)
+                if out is None and not changed:
+                    clean += end - start
+                else:
+                    if out is None:
+                        out = tempfile.NamedTemporaryFile(
+                            dir=os.path.dirname(file_path) or '.',
+                            prefix='.' + os.path.basename(file_path) + '.', delete=False)
+                        copy_prefix(file_path, out, clean)
+                    out.writelines(pieces)
+                # Keep one byte before the unprocessed rest for the identifier-boundary check
+                keep = max(end - 1, 0)
+                buffer, start = buffer[keep:], end - keep
+                if not chunk:
+                    break
+    except OSError as e:
+        print(f"Skipping unreadable file: {file_path} ({e})")
+        if out is not None:
+            out.close()
+            os.unlink(out.name)
+        return
+
+    if out is not None:
+        out.close()
+        shutil.copymode(file_path, out.name)
+        os.replace(out.name, file_path)
         print(f"Updated content in: {file_path}")
 
-def rename_file(root, filename):
-    old_path = os.path.join(root, filename)
+def new_file_name(filename, engine):
+    """Name a file gets after the rebrand (unchanged when nothing applies)."""
     name, ext = os.path.splitext(filename)
-    
-    new_name = name
-    
-    # 1. Check specific mappings
-    if name in CLASS_MAPPINGS:
-        new_name = CLASS_MAPPINGS[name]
-    else:
-        # 2. Check generic prefix
-        if name.startswith(OLD_PREFIX):
-            new_name = name.replace(OLD_PREFIX, NEW_PREFIX, 1)
-            
-    if new_name != name:
-        new_filename = new_name + ext
-        new_path = os.path.join(root, new_filename)
-        os.rename(old_path, new_path)
+    return engine.rename(name) + ext
+
+def rename_file(root, filename, engine=None):
+    new_filename = new_file_name(filename, engine or build_engine())
+    if new_filename != filename:
+        os.rename(os.path.join(root, filename), os.path.join(root, new_filename))
         print(f"Renamed: {filename} -> {new_filename}")
 
-def process_directory(root_dir):
-    # 1. Replace text in files
-    for root, dirs, files in os.walk(root_dir):
-        if 'Pods' in root or '.git' in root or 'build' in root:
-            continue
-            
-        for file in files:
-            file_path = os.path.join(root, file)
-            # Skip hidden files
-            if file.startswith('.'):
-                continue
-            
-            # Allow text replacement in all non-hidden files
-            # if file.endswith(('.swift', '.xml', '.plist', '.xib', '.storyboard', '.pbxproj', '.h', '.m', '.json')):
-            if True:
-                replace_text_in_file(file_path)
-
-    # 2. Rename files (Post-order traversal would be safer for directories, but here we just do files first)
-    # We need to handle directory renaming too if any directories start with WLD
-    
-    for root, dirs, files in os.walk(root_dir, topdown=False): # Bottom up
-        if 'Pods' in root or '.git' in root or 'build' in root:
+def is_excluded(name, excludes):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in excludes)
+
+def walk_tree(root_dir, excludes=DEFAULT_EXCLUDES):
+    """Yield (entry, depth) for every file and directory below root_dir.
+
+    Uses os.scandir and never descends into directories whose name matches
+    one of the exclude patterns.
+    """
+    stack = [(root_dir, 1)]
+    while stack:
+        path, depth = stack.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if is_excluded(entry.name, excludes):
+                        continue
+                    stack.append((entry.path, depth + 1))
+                yield entry, depth
+
+def apply_renames(plan):
+    """Rename deepest paths first, so every old path is still valid when its turn comes.
+
+    Returns {old path: new path} of the renames actually made.
+    """
+    applied = {}
+    for depth, old_path, new_path, is_dir in sorted(plan, key=lambda item: item[0], reverse=True):
+        if os.path.exists(new_path):
+            print(f"Skipping rename, target exists: {new_path}")
             continue
+        os.rename(old_path, new_path)
+        applied[old_path] = new_path
+        old_name, new_name = os.path.basename(old_path), os.path.basename(new_path)
+        print(f"Renamed Directory: {old_name} -> {new_name}" if is_dir else f"Renamed: {old_name} -> {new_name}")
+    return applied
 
-        for file in files:
-            rename_file(root, file)
-            
-        for dir_name in dirs:
-             if dir_name.startswith(OLD_PREFIX):
-                new_dir_name = dir_name.replace(OLD_PREFIX, NEW_PREFIX, 1)
-                os.rename(os.path.join(root, dir_name), os.path.join(root, new_dir_name))
-                print(f"Renamed Directory: {dir_name} -> {new_dir_name}")
+def project_file(path):
+    """project.pbxproj of an .xcodeproj directory, or path itself"""
+    return os.path.join(path, "project.pbxproj") if os.path.isdir(path) else path
+
+def update_projects(projects, applied):
+    """Apply the renames to every parsed project and write each one back once."""
+    for project in projects:
+        count = project.apply_renames(applied)
+        target = renamed_path(os.path.abspath(project.path), applied)
+        if project.save(target):
+            print(f"Updated project: {target} ({count} file/group reference(s) renamed)")
+
+def process_directory(root_dir, excludes=DEFAULT_EXCLUDES, engine=None, project_paths=()):
+    """Rewrite file contents and rename files and directories in one traversal.
+
+    Xcode projects (found in the tree or given in project_paths) are parsed
+    up front and updated from the renames actually made.
+    """
+    engine = engine or build_engine()
+    plan = []  # (depth, old path, new path, is directory)
+    projects = [PBXProject.load(project_file(path)) for path in project_paths]
+
+    for entry, depth in walk_tree(root_dir, excludes):
+        if entry.is_dir(follow_symlinks=False):
+            new_name = engine.rename(entry.name)
+        elif entry.name.endswith('.pbxproj'):
+            projects.append(PBXProject.load(entry.path))
+            new_name = entry.name
+        else:
+            # Hidden files keep their content, but still follow the rename rules
+            if not entry.name.startswith('.'):
+                replace_text_in_file(entry.path, engine)
+            new_name = new_file_name(entry.name, engine)
+        if new_name != entry.name:
+            plan.append((depth, entry.path, os.path.join(os.path.dirname(entry.path), new_name), entry.is_dir()))
+
+    # Renames wait until the walk is done so it never sees a half-renamed tree
+    update_projects(projects, apply_renames(plan))
+
+def main():
+    parser = argparse.ArgumentParser(description="Project Class-Prefix Renamer")
+    parser.add_argument("directory", help="Project directory to rewrite and rename")
+    parser.add_argument("--mappings", default=None, help="JSON file of specific old -> new names (default: built-in CLASS_MAPPINGS)")
+    parser.add_argument("--old-prefix", default=OLD_PREFIX, help=f"Class prefix to replace (default: {OLD_PREFIX})")
+    parser.add_argument("--new-prefix", default=NEW_PREFIX, help=f"Replacement class prefix (default: {NEW_PREFIX})")
+    parser.add_argument("--exclude", action="append", default=None,
+                        help="Directory name pattern to skip; repeatable (default: Pods, .git, build)")
+    parser.add_argument("--project", action="append", default=[],
+                        help="Extra .xcodeproj / project.pbxproj outside the directory to update; repeatable")
+    args = parser.parse_args()
+
+    root_dir = os.path.abspath(args.directory)
+    if not os.path.isdir(root_dir):
+        print(f"❌ Error: '{root_dir}' is not a valid directory.")
+        sys.exit(1)
+
+    mappings = load_mappings(args.mappings) if args.mappings else None
+    engine = build_engine(mappings, args.old_prefix, args.new_prefix)
+    excludes = tuple(args.exclude) if args.exclude else DEFAULT_EXCLUDES
+
+    missing = [path for path in args.project if not os.path.isfile(project_file(path))]
+    if missing:
+        print(f"❌ Error: no project.pbxproj in: {', '.join(missing)}")
+        sys.exit(1)
 
-if __name__ == "__main__":
     print("Starting Obfuscation...")
-    process_directory(ROOT_DIR)
+    process_directory(root_dir, excludes, engine, [os.path.abspath(path) for path in args.project])
     print("Obfuscation Complete.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Xcode Project Model
+-------------------
+Parses an Xcode project file (the OpenStep plist format Xcode writes) into
+plain dicts / lists / strings, keeping the source span of every value and of
+every /* comment */ that follows an object id. Edits are recorded against
+those spans and spliced into the original text in one pass, so everything
+that was not renamed stays byte-for-byte as Xcode wrote it.
+
+apply_renames() takes the on-disk rename plan of obfuscate_project.py
+({old absolute path: new absolute path}) and updates, for every file
+reference and group that resolves to a renamed path, its path, its name
+(when it was the old file name) and the comments naming it, plus build
+settings holding paths into the tree (INFOPLIST_FILE, ...).
+"""
+
+import os
+import re
+
+OBJECT_ID = re.compile(r'[0-9A-F]{24}')
+UNQUOTED = re.compile(r'[A-Za-z0-9_$/:.\-+]+')
+TOKEN = re.compile(r'''
+      (?P<space>\s+)
+    | (?P<comment>/\*.*?\*/)
+    | (?P<line_comment>//[^\n]*)
+    | (?P<quoted>"(?:[^"\\]|\\.)*")
+    | (?P<unquoted>[A-Za-z0-9_$/:.\-+]+)
+    | (?P<punct>[{}()=;,])
+''', re.VERBOSE | re.DOTALL)
+
+# Objects whose path / name locate something on disk
+PATH_ISAS = {"PBXFileReference", "PBXGroup", "PBXVariantGroup", "XCVersionGroup"}
+# Build settings may point into the tree relative to the project, with or without these
+SETTING_ROOTS = ("$(SRCROOT)/", "$(PROJECT_DIR)/", "$(SOURCE_ROOT)/")
+
+ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
+
+def renamed_path(path, renames):
+    """Where path ends up after a rename plan {old absolute path: new absolute path}.
+
+    Renames apply from the top down, so a renamed directory moves everything below it.
+    """
+    new, old = os.sep, os.sep
+    for part in os.path.normpath(path).strip(os.sep).split(os.sep):
+        old = os.path.join(old, part)
+        new = os.path.join(new, os.path.basename(renames[old]) if old in renames else part)
+    return new
+
+def unquote(token):
+    return re.sub(r'\\(.)', lambda m: ESCAPES.get(m.group(1), m.group(1)), token[1:-1])
+
+def quote(value, quoted=False):
+    """Value as Xcode writes it: bare when it can be, quoted (and escaped) otherwise"""
+    if not quoted and UNQUOTED.fullmatch(value) and '//' not in value and '/*' not in value:
+        return value
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\t', '\\t') + '"'
+
+class PBXProject:
+    """Parsed project.pbxproj with span-preserving edits."""
+
+    def __init__(self, text, path=None):
+        self.text = text
+        self.path = path
+        self.spans = {}      # key path tuple -> (start, end, quoted) of a scalar
+        self.comments = []   # (start, end, object id the comment follows)
+        self.edits = {}      # start -> (end, replacement)
+        self._tokens = self._tokenize(text)
+        self._pos = 0
+        self.data = self._value(())
+        del self._tokens
+        self.objects = self.data.get("objects", {})
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read(), path)
+
+    # ─── Parsing ─────────────────────────────────────────────────────────────
+
+    def _tokenize(self, text):
+        tokens = []
+        previous = None
+        for match in TOKEN.finditer(text):
+            kind = match.lastgroup
+            if kind in ('space', 'line_comment'):
+                continue
+            if kind == 'comment':
+                if previous is not None and previous[0] == 'unquoted' and OBJECT_ID.fullmatch(previous[1]):
+                    self.comments.append((match.start(), match.end(), previous[1]))
+                continue
+            previous = (kind, match.group(), match.start(), match.end())
+            tokens.append(previous)
+        return tokens
+
+    def _next(self):
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def _expect(self, punct):
+        token = self._next()
+        if token[1] != punct:
+            raise ValueError(f"{self.path or 'pbxproj'}: expected '{punct}' at offset {token[2]}, found {token[1]!r}")
+
+    def _value(self, keypath):
+        kind, text, start, end = self._next()
+        if text == '{':
+            result = {}
+            while self._tokens[self._pos][1] != '}':
+                key = self._scalar(self._next())
+                self._expect('=')
+                result[key] = self._value(keypath + (key,))
+                self._expect(';')
+            self._pos += 1
+            return result
+        if text == '(':
+            result = []
+            while self._tokens[self._pos][1] != ')':
+                result.append(self._value(keypath + (len(result),)))
+                if self._tokens[self._pos][1] == ',':
+                    self._pos += 1
+            self._pos += 1
+            return result
+        self.spans[keypath] = (start, end, kind == 'quoted')
+        return self._scalar((kind, text, start, end))
+
+    def _scalar(self, token):
+        kind, text = token[0], token[1]
+        if kind == 'quoted':
+            return unquote(text)
+        if kind == 'unquoted':
+            return text
+        raise ValueError(f"{self.path or 'pbxproj'}: unexpected {text!r} at offset {token[2]}")
+
+    # ─── Editing ─────────────────────────────────────────────────────────────
+
+    def set(self, keypath, value):
+        """Change the scalar at keypath (e.g. ("objects", id, "path"))"""
+        start, end, quoted = self.spans[keypath]
+        container = self.data
+        for key in keypath[:-1]:
+            container = container[key]
+        container[keypath[-1]] = value
+        self.edits[start] = (end, quote(value, quoted))
+
+    def display_name(self, object_id):
+        """What Xcode writes in the comment after a reference to object_id"""
+        obj = self.objects.get(object_id, {})
+        return obj.get("name") or obj.get("path")
+
+    def serialize(self):
+        if not self.edits:
+            return self.text
+        pieces, last = [], 0
+        for start in sorted(self.edits):
+            end, replacement = self.edits[start]
+            pieces.append(self.text[last:start])
+            pieces.append(replacement)
+            last = end
+        pieces.append(self.text[last:])
+        return ''.join(pieces)
+
+    def save(self, path=None):
+        """Write the project once if anything changed. Returns True if written."""
+        if not self.edits:
+            return False
+        path = path or self.path
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.serialize())
+        os.replace(tmp, path)
+        return True
+
+    # ─── Paths ───────────────────────────────────────────────────────────────
+
+    def source_root(self):
+        """Directory the project's relative paths start from (the one holding the .xcodeproj)"""
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(self.path or 'project.pbxproj')))
+        root = self.objects.get(self.data.get("rootObject"), {})
+        return os.path.normpath(os.path.join(project_dir, root.get("projectDirPath", "")))
+
+    def resolve_paths(self):
+        """{object id: (absolute path, absolute parent directory, sourceTree)} for the group tree"""
+        source_root = self.source_root()
+        root = self.objects.get(self.data.get("rootObject"), {})
+        resolved = {}
+        stack = [(root.get("mainGroup"), source_root)]
+        while stack:
+            object_id, parent = stack.pop()
+            obj = self.objects.get(object_id)
+            if obj is None or object_id in resolved:
+                continue
+            tree = obj.get("sourceTree", "<group>")
+            if tree == "<group>":
+                base = parent
+            elif tree == "SOURCE_ROOT":
+                base = source_root
+            elif tree == "<absolute>":
+                base = "/"
+            else:
+                # BUILT_PRODUCTS_DIR, SDKROOT, ...: not part of the tree
+                continue
+            path = os.path.normpath(os.path.join(base, obj["path"])) if "path" in obj else base
+            resolved[object_id] = (path, base, tree)
+            stack.extend((child, path) for child in obj.get("children", ()))
+        return resolved
+
+    def apply_renames(self, renames):
+        """Follow an on-disk rename plan {old absolute path: new absolute path}.
+
+        Returns the number of objects whose path or name changed. Nothing is
+        written until save().
+        """
+        renames = {os.path.normpath(old): os.path.normpath(new) for old, new in renames.items()}
+
+        def renamed(path):
+            return renamed_path(path, renames)
+
+        source_root = self.source_root()
+        new_source_root = renamed(source_root)
+        changed = {}   # object id -> (old display name, new display name)
+        for object_id, (path, base, tree) in self.resolve_paths().items():
+            obj = self.objects[object_id]
+            if obj.get("isa") not in PATH_ISAS or "path" not in obj:
+                continue
+            new_path = renamed(path)
+            if new_path == path:
+                continue
+            old_display = self.display_name(object_id)
+            value = new_path if tree == "<absolute>" else os.path.relpath(new_path, renamed(base))
+            if value != obj["path"]:
+                if obj.get("name") == os.path.basename(obj["path"]):
+                    self.set(("objects", object_id, "name"), os.path.basename(value))
+                self.set(("objects", object_id, "path"), value)
+            if self.display_name(object_id) != old_display:
+                changed[object_id] = (old_display, self.display_name(object_id))
+
+        for object_id, obj in self.objects.items():
+            if obj.get("isa") == "PBXBuildFile" and obj.get("fileRef") in changed:
+                changed[object_id] = changed[obj["fileRef"]]
+            elif obj.get("isa") == "XCBuildConfiguration":
+                for key, value in obj.get("buildSettings", {}).items():
+                    if isinstance(value, str) and '/' in value:
+                        self._rename_setting(("objects", object_id, "buildSettings", key), value,
+                                             source_root, new_source_root, renamed)
+
+        for start, end, object_id in self.comments:
+            if object_id in changed:
+                old, new = changed[object_id]
+                comment = self.text[start + 2:end - 2].strip()
+                if comment == old or comment.startswith(old + ' in '):
+                    self.edits[start] = (end, f"/* {new}{comment[len(old):]} */")
+        return sum(1 for object_id in changed if self.objects[object_id].get("isa") in PATH_ISAS)
+
+    def _rename_setting(self, keypath, value, source_root, new_source_root, renamed):
+        prefix = next((root for root in SETTING_ROOTS if value.startswith(root)), "")
+        relative = value[len(prefix):]
+        if '$' in relative or os.path.isabs(relative):
+            return
+        path = os.path.normpath(os.path.join(source_root, relative))
+        new_path = renamed(path)
+        if new_path != path:
+            self.set(keypath, prefix + os.path.relpath(new_path, new_source_root))
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+PNG 无损压缩 - 选择最小的无损表示
+Usage:
+    python3 png_optimize.py <path> [<path> ...] [--jobs N] [--fast]
+
+Arguments:
+    path      PNG files, or directories searched recursively for *.png
+    --jobs    Worker processes (default: one per CPU)
+    --fast    Skip the slow zlib level 9 attempt (about 2.5x faster, a little larger)
+
+Examples:
+    python3 png_optimize.py generated_avatars_v2
+    python3 png_optimize.py wldo/Assets.xcassets --jobs 8
+
+For every image the smallest of these lossless representations is kept:
+    - the image as is
+    - RGBA/LA without the alpha channel, when every pixel is opaque
+    - L instead of RGB, when every pixel is grey
+    - a palette image (with per-entry alpha), when there are at most 256
+      colours; 1/2/4-bit when few enough
+Each representation is encoded with several zlib strategies. Pillow picks the
+PNG row filter itself (adaptive for 8-bit, none for palette images). The
+winner is decoded again and compared pixel by pixel with the original before
+it is used, and the colour management and metadata chunks (iCCP, sRGB,
+gAMA, cHRM, eXIf, pHYs) are written again, so the stage can never change
+what is displayed. Files Pillow cannot round-trip exactly (16-bit samples,
+interlaced PNGs, APNGs) are left as they are.
+
+The generators and xcassets.py save through save_png() / optimized_png().
+"""
+
+import io
+import os
+import sys
+import zlib
+import struct
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, PngImagePlugin
+
+from render_cache import MANIFEST_NAME, RenderManifest
+
+# Pillow's own choice: Z_FILTERED for 8-bit images, Z_DEFAULT_STRATEGY for palettes
+PILLOW_STRATEGY = -1
+
+# (compress_level, strategy). Every representation is encoded with the first
+# setting; only the smallest one is then also tried with the rest. Level 9
+# wins on most generated images; Z_RLE is cheap and wins on flat gradients.
+ZLIB_SETTINGS = (
+    (6, PILLOW_STRATEGY),
+    (9, PILLOW_STRATEGY),
+    (9, zlib.Z_RLE),
+)
+FAST_SETTINGS = ((6, PILLOW_STRATEGY), (9, zlib.Z_RLE))
+
+def palette_bits(count):
+    for bits in (1, 2, 4):
+        if count <= 1 << bits:
+            return bits
+    return 8
+
+def palette_image(img):
+    """Exact palette version of an RGB/RGBA image, or None if it has more than 256 colours"""
+    if img.getcolors(256) is None:
+        return None, 8
+    pixels = np.asarray(img.convert('RGBA'), dtype=np.uint32)
+    # Alpha in the top byte: sorting puts translucent entries first, keeping tRNS short
+    packed = (pixels[..., 3] << 24) | (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+    colors, indices = np.unique(packed, return_inverse=True)
+
+    palette = np.empty((len(colors), 4), dtype=np.uint8)
+    palette[:, 0] = colors >> 16
+    palette[:, 1] = colors >> 8
+    palette[:, 2] = colors
+    palette[:, 3] = colors >> 24
+
+    result = Image.fromarray(indices.reshape(packed.shape).astype(np.uint8), 'P')
+    if img.mode == 'RGBA':
+        result.putpalette(palette.tobytes(), rawmode='RGBA')
+    else:
+        result.putpalette(palette[:, :3].tobytes(), rawmode='RGB')
+    return result, palette_bits(len(colors))
+
+def metadata_options(info):
+    """Save options that carry img.info's colour management and metadata chunks over"""
+    options = {}
+    for key in ('icc_profile', 'exif', 'dpi'):
+        if info.get(key):
+            options[key] = info[key]
+    chunks = PngImagePlugin.PngInfo()
+    if 'gamma' in info:
+        chunks.add(b"gAMA", round(info['gamma'] * 100000).to_bytes(4, 'big'))
+    if 'chromaticity' in info:
+        chunks.add(b"cHRM", b''.join(round(value * 100000).to_bytes(4, 'big') for value in info['chromaticity']))
+    if 'srgb' in info and 'icc_profile' not in options:
+        chunks.add(b"sRGB", bytes([info['srgb']]))
+    if chunks.chunks:
+        options['pnginfo'] = chunks
+    return options
+
+def representations(img, info=None):
+    """Yield (image, extra save options) for every lossless representation of img"""
+    yield img, {}
+
+    if img.mode in ('RGBA', 'LA'):
+        alpha = img.getchannel('A')
+        if alpha.getextrema() == (255, 255):
+            img = img.convert(img.mode[:-1])
+            yield img, {}
+
+    # An RGB ICC profile is invalid on a greyscale PNG
+    if img.mode == 'RGB' and not (info or {}).get('icc_profile'):
+        pixels = np.asarray(img)
+        if (pixels[..., 0] == pixels[..., 1]).all() and (pixels[..., 1] == pixels[..., 2]).all():
+            yield Image.fromarray(pixels[..., 0], 'L'), {}
+
+    if img.mode in ('RGB', 'RGBA'):
+        palette, bits = palette_image(img)
+        if palette is not None:
+            yield palette, {"bits": bits} if bits < 8 else {}
+
+def encode(img, level, strategy, **options):
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG', compress_level=level, compress_type=strategy, **options)
+    return buffer.getvalue()
+
+def same_pixels(data, img):
+    with Image.open(io.BytesIO(data)) as decoded:
+        return decoded.convert(img.mode).tobytes() == img.tobytes()
+
+def optimized_png(img, fast=False, info=None):
+    """Smallest lossless PNG encoding of img, as bytes.
+
+    Colour management and metadata chunks of info (default img.info) are kept.
+    """
+    settings = FAST_SETTINGS if fast else ZLIB_SETTINGS
+    level, strategy = settings[0]
+    info = img.info if info is None else info
+    metadata = metadata_options(info)
+
+    best, best_rep = None, None
+    for rep, options in representations(img, info):
+        options = dict(options, **metadata)
+        data = encode(rep, level, strategy, **options)
+        if best is None or len(data) < len(best):
+            best, best_rep = data, (rep, options)
+
+    rep, options = best_rep
+    for level, strategy in settings[1:]:
+        data = encode(rep, level, strategy, **options)
+        if len(data) < len(best):
+            best = data
+
+    if rep is not img and not same_pixels(best, img):
+        # Never ship a representation that does not round-trip
+        return encode(img, *settings[0], **metadata)
+    return best
+
+def save_png(img, output_path, fast=False):
+    with open(output_path, 'wb') as f:
+        f.write(optimized_png(img, fast))
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def lossless_candidate(data):
+    """Whether Pillow decodes this PNG without losing anything a re-encode would keep.
+
+    Pillow reduces 16-bit RGB(A) samples to 8 bits, and re-encoding drops
+    Adam7 interlacing and every APNG frame but the first.
+    """
+    if not data.startswith(PNG_SIGNATURE) or data[12:16] != b'IHDR':
+        return False
+    bit_depth, interlace = data[24], data[28]
+    if bit_depth > 8 or interlace:
+        return False
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack_from('>I4s', data, pos)
+        if kind == b'acTL':
+            return False
+        if kind == b'IDAT':
+            break
+        pos += 12 + length
+    return True
+
+def optimize_file(path, fast=False):
+    """Re-encode a PNG in place if that makes it smaller. Returns (path, bytes before, bytes after)."""
+    with open(path, 'rb') as f:
+        original = f.read()
+    if not lossless_candidate(original):
+        return path, len(original), len(original)
+    with Image.open(io.BytesIO(original)) as img:
+        img.load()
+        if img.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            return path, len(original), len(original)
+        info = dict(img.info)
+        if img.mode == 'P':
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        data = optimized_png(img, fast, info)
+
+    if len(data) >= len(original):
+        return path, len(original), len(original)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path, len(original), len(data)
+
+def optimize_task(task):
+    return optimize_file(*task)
+
+def png_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    if filename.lower().endswith('.png'):
+                        yield os.path.join(root, filename)
+        else:
+            yield path
+
+def restamp(results):
+    """Keep render manifests valid for files that were rewritten in place."""
+    manifests = {}
+    for path, before, after in results:
+        if after == before:
+            continue
+        directory = os.path.dirname(path)
+        # Imagesets are recorded as a whole in the catalog's manifest
+        owner = directory if directory.endswith('.imageset') else path
+        manifest_dir = os.path.dirname(owner)
+        if not os.path.exists(os.path.join(manifest_dir, MANIFEST_NAME)):
+            continue
+        if manifest_dir not in manifests:
+            manifests[manifest_dir] = RenderManifest.load(manifest_dir)
+        manifests[manifest_dir].restamp(owner)
+    for manifest in manifests.values():
+        manifest.save()
+
+def main():
+    parser = argparse.ArgumentParser(description="Lossless PNG optimizer")
+    parser.add_argument("paths", nargs="+", help="PNG files or directories")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes (default: 0 = one per CPU)")
+    parser.add_argument("--fast", action="store_true", help="Only try the quick zlib settings")
+    args = parser.parse_args()
+
+    files = list(png_files(args.paths))
+    if not files:
+        print("❌ Error: no PNG files found.")
+        sys.exit(1)
+
+    jobs = args.jobs or os.cpu_count()
+    print(f"🗜️  Optimizing {len(files)} PNG(s) with {jobs} worker(s)...\n")
+
+    tasks = [(path, args.fast) for path in files]
+    if jobs <= 1:
+        results = list(map(optimize_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(optimize_task, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+
+    total_before = total_after = 0
+    for path, before, after in results:
+        total_before += before
+        total_after += after
+        if after < before:
+            print(f"✓ {path}: {before:,} → {after:,} bytes (-{(before - after) * 100 / before:.1f}%)")
+    restamp(results)
+
+    saved = total_before - total_after
+    percent = saved * 100 / total_before if total_before else 0.0
+    print(f"\n✅ Saved {saved:,} bytes ({percent:.1f}%): {total_before:,} → {total_after:,} bytes")
+
+if __name__ == "__main__":
+    main()
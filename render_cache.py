@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+渲染缓存 - 输入未变的图片不再重新生成
+Every image is keyed by a hash of everything that goes into it: the config
+entry, the image size, the identity of the font files it may use and the
+generator version. Keys are kept in a manifest next to the images
+(.render_manifest.json); when a key and the file on disk both still match,
+the image is skipped and its mtime is left alone, so Xcode does not
+recompile the asset catalog for nothing.
+
+Bump a script's GENERATOR_VERSION whenever its drawing code changes.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import functools
+
+MANIFEST_NAME = ".render_manifest.json"
+
+@functools.lru_cache(maxsize=None)
+def font_identity(path):
+    """(path, size, mtime_ns) of a font file, or None if it is not installed"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+def render_key(generator, version, config, size, fonts=()):
+    """Content hash of one render's full input."""
+    payload = {
+        "generator": generator,
+        "version": version,
+        "config": config,
+        "size": list(size),
+        "fonts": [font_identity(path) for path in fonts],
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def file_stamp(path):
+    """[size, mtime_ns] of path, or None if it does not exist.
+
+    For a directory (an .imageset), the sorted stamps of the files in it.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if os.path.isdir(path):
+        return sorted([entry.name, *file_stamp(entry.path)] for entry in os.scandir(path) if entry.is_file())
+    return [stat.st_size, stat.st_mtime_ns]
+
+class RenderManifest:
+    """Render keys of the images in one output directory, by file name.
+
+    Each entry also records the size and mtime of the file (or of every file
+    in the imageset directory) as written, so an image that was deleted or
+    edited by hand is rendered again.
+    """
+
+    VERSION = 1
+
+    def __init__(self, directory, entries=None):
+        self.directory = directory
+        self.entries = entries or {}
+        self.dirty = False
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    @classmethod
+    def load(cls, directory):
+        try:
+            with open(os.path.join(directory, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(directory)
+        if data.get("version") != cls.VERSION:
+            return cls(directory)
+        return cls(directory, data.get("images", {}))
+
+    def fresh(self, output_path, key):
+        """True if output_path was rendered from key and is untouched since."""
+        entry = self.entries.get(os.path.basename(output_path))
+        return (entry is not None and entry["key"] == key
+                and entry["stamp"] == file_stamp(output_path))
+
+    def record(self, output_path, key):
+        self.entries[os.path.basename(output_path)] = {"key": key, "stamp": file_stamp(output_path)}
+        self.dirty = True
+
+    def restamp(self, output_path):
+        """Accept the current file as rendered, e.g. after png_optimize.py rewrote it losslessly."""
+        entry = self.entries.get(os.path.basename(output_path))
+        if entry is not None:
+            entry["stamp"] = file_stamp(output_path)
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.VERSION, "images": self.entries}, f, indent=2, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+SDK Symbol Set
+--------------
+Usage:
+    python3 sdk_symbols.py build <source> [<source> ...] --output SDK_SET
+    python3 sdk_symbols.py check <sdk_set_or_source> <name> [<name> ...]
+
+Arguments:
+    source      .swiftinterface files, Objective-C headers (.h), plain symbol lists
+                (.txt / .symbols, one name or selector per line, '#' comments),
+                or directories searched recursively for all of these
+    --output    Where to write the frozen set (e.g. ios17.sdkset)
+    name        Names to look up
+
+Examples:
+    python3 sdk_symbols.py build \\
+        "$(xcrun --show-sdk-path --sdk iphoneos)/System/Library/Frameworks/UIKit.framework" \\
+        "$(xcrun --show-sdk-path --sdk iphoneos)/System/Library/Frameworks/WebKit.framework" \\
+        --output ios.sdkset
+    python3 sdk_symbols.py check ios.sdkset webView userContentController setupUI
+    python3 swift_obfuscate.py ./wldo --sdk-symbols ios.sdkset
+
+Every func / property / case name the SDK declares is reduced to its Swift
+base name (webView(_:didFinish:) -> webView) and stored as a 64-bit hash in
+an open-addressing table of at most half load, so a lookup costs one hash
+and about one probe however many names the SDK has. The table is saved as
+raw little-endian words and loaded with a single read.
+"""
+
+import os
+import re
+import sys
+import struct
+import hashlib
+import argparse
+from array import array
+from pathlib import Path
+
+MAGIC = b"SDKSYM1\0"
+HEADER = struct.Struct("<8sQQ")   # magic, names, table slots
+SET_SUFFIX = ".sdkset"
+
+INTERFACE_SUFFIXES = {".swiftinterface"}
+HEADER_SUFFIXES = {".h"}
+LIST_SUFFIXES = {".txt", ".symbols"}
+
+INTERFACE_DECLARATION = re.compile(r'\b(?:func|var|let|case)\s+`?([A-Za-z_]\w*)')
+OBJC_METHOD = re.compile(r'^\s*[-+]\s*\((?:[^()]|\([^()]*\))*\)\s*([A-Za-z_]\w*)', re.MULTILINE)
+OBJC_PROPERTY = re.compile(r'@property\b[^;]*;')
+SWIFT_NAME = re.compile(r'\bNS_SWIFT_NAME\(\s*(?:[A-Za-z_]\w*\.)*([A-Za-z_]\w*)')
+# Availability / nullability macros trailing a property, e.g. API_AVAILABLE(ios(13.0))
+MACRO_CALL = re.compile(r'\b[A-Z][A-Z0-9_]+(?:\((?:[^()]|\([^()]*\))*\))?')
+IDENTIFIER = re.compile(r'[A-Za-z_]\w*')
+
+def name_hash(name: str) -> int:
+    """64-bit hash of a name; 0 marks an empty slot, so it is never returned"""
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+def interface_names(text: str):
+    """Declared names of a .swiftinterface"""
+    return INTERFACE_DECLARATION.findall(text)
+
+def header_names(text: str):
+    """Swift base names of the methods and properties of an Objective-C header"""
+    names = OBJC_METHOD.findall(text) + SWIFT_NAME.findall(text)
+    for declaration in OBJC_PROPERTY.findall(text):
+        identifiers = IDENTIFIER.findall(MACRO_CALL.sub(' ', declaration[len('@property'):]))
+        if identifiers:
+            names.append(identifiers[-1])
+    return names
+
+def list_names(text: str):
+    """Names of a symbol list: 'name', 'name(_:label:)' or 'Module.Type.name(...)' per line"""
+    names = []
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].split('(', 1)[0].strip()
+        match = IDENTIFIER.fullmatch(line.rsplit('.', 1)[-1]) if line else None
+        if match:
+            names.append(match.group())
+    return names
+
+PARSERS = {}
+PARSERS.update(dict.fromkeys(INTERFACE_SUFFIXES, interface_names))
+PARSERS.update(dict.fromkeys(HEADER_SUFFIXES, header_names))
+PARSERS.update(dict.fromkeys(LIST_SUFFIXES, list_names))
+
+def source_files(paths):
+    """Every symbol source among paths, directories expanded recursively"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix in PARSERS and p.is_file())
+        else:
+            yield path
+
+def collect_names(paths) -> set:
+    names = set()
+    for path in source_files(paths):
+        parse = PARSERS.get(path.suffix, list_names)
+        names.update(parse(path.read_text(encoding='utf-8', errors='ignore')))
+    return names
+
+class SymbolSet:
+    """Frozen set of names stored as 64-bit hashes in a linear-probing table."""
+
+    def __init__(self, table: array, count: int):
+        self.table = table
+        self.mask = len(table) - 1
+        self.count = count
+
+    @classmethod
+    def build(cls, names, hashes=()) -> "SymbolSet":
+        """Set of names, plus hashes already computed (e.g. those of a loaded set)"""
+        hashes = {name_hash(name) for name in names} | set(hashes)
+        slots = 1 << max(4, (2 * len(hashes)).bit_length())
+        table = array('Q', bytes(8 * slots))
+        mask = slots - 1
+        for value in hashes:
+            slot = value & mask
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = value
+        return cls(table, len(hashes))
+
+    def __contains__(self, name) -> bool:
+        value = name_hash(name)
+        table, mask = self.table, self.mask
+        slot = value & mask
+        while True:
+            found = table[slot]
+            if found == value:
+                return True
+            if not found:
+                return False
+            slot = (slot + 1) & mask
+
+    def __len__(self) -> int:
+        return self.count
+
+    def hashes(self):
+        return (value for value in self.table if value)
+
+    def save(self, path: str):
+        table = self.table
+        if sys.byteorder != 'little':
+            table = array('Q', table)
+            table.byteswap()
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.count, len(table)))
+            f.write(table.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "SymbolSet":
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"'{path}' is not an SDK symbol set (empty or truncated)")
+        magic, count, slots = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not an SDK symbol set")
+        if len(data) != HEADER.size + 8 * slots or not slots or slots & (slots - 1) or count >= slots:
+            raise ValueError(f"'{path}' is a truncated or damaged SDK symbol set")
+        table = array('Q')
+        table.frombytes(data[HEADER.size:])
+        if sys.byteorder != 'little':
+            table.byteswap()
+        return cls(table, count)
+
+def load_symbols(paths) -> SymbolSet:
+    """A saved .sdkset as is, or the union of saved sets and interface / header / list sources"""
+    paths = list(paths)
+    sets = [SymbolSet.load(path) for path in paths if path.endswith(SET_SUFFIX)]
+    sources = [path for path in paths if not path.endswith(SET_SUFFIX)]
+    if len(sets) == 1 and not sources:
+        return sets[0]
+    return SymbolSet.build(collect_names(sources), (value for symbols in sets for value in symbols.hashes()))
+
+def main():
+    parser = argparse.ArgumentParser(description="SDK Symbol Set")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="Build a frozen symbol set from SDK sources")
+    build_parser.add_argument("sources", nargs="+", help=".swiftinterface / .h / symbol list files or directories")
+    build_parser.add_argument("--output", required=True, help=f"Output file (e.g. ios{SET_SUFFIX})")
+
+    check_parser = commands.add_parser("check", help="Look names up in a symbol set")
+    check_parser.add_argument("symbols", help=f"{SET_SUFFIX} file or a single source")
+    check_parser.add_argument("names", nargs="+", help="Names to look up")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        missing = [path for path in args.sources if not os.path.exists(path)]
+        if missing:
+            print(f"❌ Error: not found: {', '.join(missing)}")
+            sys.exit(1)
+        names = collect_names(args.sources)
+        symbols = SymbolSet.build(names)
+        symbols.save(args.output)
+        print(f"✅ {len(symbols):,} SDK names → {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+        return
+
+    try:
+        symbols = load_symbols([args.symbols])
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    for name in args.names:
+        print(f"   {'🔒 SDK ' if name in symbols else '   own '} {name}")
+
+if __name__ == "__main__":
+    main()
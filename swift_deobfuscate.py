@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Swift Method Name De-obfuscator
+-------------------------------
+Usage:
+    python3 swift_deobfuscate.py log <map_file> [<log_file> ...] [--output OUT]
+    python3 swift_deobfuscate.py restore <map_file> <target_directory> [--dry-run] [--jobs N]
+
+Arguments:
+    map_file           JSON mapping written by swift_obfuscate.py ({"original": "obfuscated"}), or a map store (*.oxmap)
+    log_file           Crash logs / build logs to symbolicate (default: stdin; '-' also means stdin)
+    --output           Write the restored log here instead of stdout
+    target_directory   Obfuscated source tree to restore in place
+    --dry-run          Preview which files would be restored
+    --jobs             Worker processes for the restore (default: 1, 0 = one per CPU)
+
+Examples:
+    python3 swift_deobfuscate.py log obfuscation_map.json crash.log
+    xcodebuild ... 2>&1 | python3 swift_deobfuscate.py log obfuscation_map.json
+    python3 swift_deobfuscate.py log obfuscation_map.json build.log --output build.restored.log
+    python3 swift_deobfuscate.py restore obfuscation_map.json ./wldo/cc --jobs 0
+
+Logs are streamed in line-aligned chunks of raw bytes, so files of any size
+use constant memory and undecodable bytes pass through untouched. Only the
+obfuscated-name prefixes (e.g. "ox_") are searched for; each hit is looked up
+in the inverted map. Besides plain names, length-prefixed names inside
+mangled Swift symbols ($s4wldo3FooC11ox_a3Fk9mXzyyF) are restored with their
+length fixed up.
+
+restore runs apply_obfuscation with the inverted map, so it rewrites the same
+code-only identifiers in a single pass per file.
+"""
+
+import os
+import re
+import sys
+import argparse
+
+from swift_obfuscate import apply_obfuscation
+from map_store import load_map
+
+CHUNK_SIZE = 1024 * 1024
+IDENTIFIER_RUN = re.compile(rb'[A-Za-z0-9_]*')
+IDENTIFIER_BYTES = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_$')
+DIGITS = frozenset(b'0123456789')
+
+def invert_map(mapping: dict) -> dict:
+    """obfuscated -> original. Raises ValueError if two names share an obfuscated name."""
+    inverse = {}
+    for original, obfuscated in mapping.items():
+        if inverse.setdefault(obfuscated, original) != original:
+            raise ValueError(f"'{obfuscated}' is mapped from both '{inverse[obfuscated]}' and '{original}'")
+    return inverse
+
+def name_prefix(name: str) -> str:
+    """Literal prefix every log search starts from: up to the last '_' (ox_a3Fk9mXz -> ox_)"""
+    cut = name.rfind('_')
+    return name[:cut + 1] if cut > 0 else name
+
+class LogRestorer:
+    """Rewrites obfuscated names in byte buffers back to their originals."""
+
+    def __init__(self, inverse: dict):
+        self.names = {obfuscated.encode('utf-8'): original.encode('utf-8')
+                      for obfuscated, original in inverse.items()}
+        prefixes = sorted({name_prefix(name) for name in inverse}, key=len, reverse=True)
+        self.pattern = re.compile(b'|'.join(re.escape(prefix.encode('utf-8')) for prefix in prefixes)) if prefixes else None
+
+    def restore(self, buffer: bytes) -> bytes:
+        if self.pattern is None:
+            return buffer
+        names = self.names
+        pieces = []
+        last = 0
+        for match in self.pattern.finditer(buffer):
+            start = match.start()
+            if start < last:
+                continue
+            end = IDENTIFIER_RUN.match(buffer, match.end()).end()
+
+            # Mangled symbol: <length><name>, the name possibly followed by more mangling
+            digits = start
+            while digits > last and buffer[digits - 1] in DIGITS and start - digits < 4:
+                digits -= 1
+            if digits < start:
+                length = int(buffer[digits:start])
+                original = names.get(buffer[start:start + length]) if start + length <= end else None
+                if original is not None:
+                    pieces.append(buffer[last:digits])
+                    pieces.append(b'%d' % len(original))
+                    pieces.append(original)
+                    last = start + length
+                    continue
+
+            # Plain identifier
+            if start > 0 and buffer[start - 1] in IDENTIFIER_BYTES:
+                continue
+            original = names.get(buffer[start:end])
+            if original is not None:
+                pieces.append(buffer[last:start])
+                pieces.append(original)
+                last = end
+        if not pieces:
+            return buffer
+        pieces.append(buffer[last:])
+        return b''.join(pieces)
+
+    def stream(self, source, sink, chunk_size: int = CHUNK_SIZE) -> int:
+        """Copy source to sink restoring names, in chunks cut at line ends. Returns bytes read."""
+        total = 0
+        pending = b''
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            total += len(chunk)
+            # Names never span lines, so everything up to the last newline is safe to rewrite
+            cut = chunk.rfind(b'\n')
+            if cut < 0:
+                pending += chunk
+                continue
+            sink.write(self.restore(pending + chunk[:cut + 1]))
+            pending = chunk[cut + 1:]
+        if pending:
+            sink.write(self.restore(pending))
+        return total
+
+def restore_logs(restorer: LogRestorer, paths: list, output: str = None) -> int:
+    """Restore every log in paths ('-' = stdin) into output (None = stdout). Returns bytes read."""
+    total = 0
+    sink = open(output, 'wb') if output else sys.stdout.buffer
+    try:
+        for path in paths:
+            if path == '-':
+                total += restorer.stream(sys.stdin.buffer, sink)
+            else:
+                with open(path, 'rb') as source:
+                    total += restorer.stream(source, sink)
+    finally:
+        if output:
+            sink.close()
+        else:
+            sink.flush()
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="Swift Method Name De-obfuscator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    log_parser = commands.add_parser("log", help="Restore original names in crash / build logs")
+    log_parser.add_argument("map_file", help="Mapping JSON written by swift_obfuscate.py")
+    log_parser.add_argument("logs", nargs="*", default=['-'], help="Log files (default: stdin)")
+    log_parser.add_argument("--output", default=None, help="Output file (default: stdout)")
+
+    restore_parser = commands.add_parser("restore", help="Restore an obfuscated source tree in place")
+    restore_parser.add_argument("map_file", help="Mapping JSON written by swift_obfuscate.py")
+    restore_parser.add_argument("directory", help="Obfuscated directory containing .swift files")
+    restore_parser.add_argument("--dry-run", action="store_true", help="Preview changes without modifying files")
+    restore_parser.add_argument("--jobs", type=int, default=1, help="Worker processes (default: 1, 0 = one per CPU)")
+    args = parser.parse_args()
+
+    try:
+        inverse = invert_map(load_map(args.map_file))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: cannot use map '{args.map_file}': {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == "log":
+        # stdout may be the restored log itself, so progress goes to stderr
+        total = restore_logs(LogRestorer(inverse), args.logs, args.output)
+        print(f"✅ Restored {total:,} bytes of log using {len(inverse)} names.", file=sys.stderr)
+        return
+
+    target_dir = os.path.abspath(args.directory)
+    if not os.path.isdir(target_dir):
+        print(f"❌ Error: '{target_dir}' is not a valid directory.")
+        sys.exit(1)
+
+    print(f"\n{'🔍 [DRY RUN] ' if args.dry_run else ''}⚙️  Restoring {len(inverse)} names in: {target_dir}")
+    count = apply_obfuscation(target_dir, inverse, dry_run=args.dry_run, jobs=args.jobs or os.cpu_count())
+    print(f"\n✅ {'Would restore' if args.dry_run else 'Restored'} {count} file(s).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Swift Lexer
+-----------
+Streaming tokenizer used by swift_obfuscate.py. One linear scan of a Swift
+source yields every identifier together with the lexical context it appears in,
+so callers only ever touch real code identifiers.
+
+Contexts:
+    code            ordinary Swift code
+    interpolation   code inside a string interpolation "\\(...)"
+    selector        arguments of #selector(...) / #keyPath(...)
+    objc            explicit Objective-C names in @objc(...)
+
+String literal contents ("...", multi-line \"\"\"...\"\"\", raw #"..."#) and
+comments (//, nested /* */) never produce identifiers.
+
+The source may also be bytes (or an mmap / any bytes-like buffer): the same
+scan then runs on the raw UTF-8 without decoding it, offsets are byte
+offsets and names are bytes. Non-ASCII bytes count as identifier characters.
+
+With structure=True, attributes and directives (@objc, #selector) and the
+brackets of code are yielded too, so a caller can follow declarations and
+scopes (see swift_symbol_index.py).
+"""
+
+import re
+from typing import Iterator, NamedTuple
+
+CODE = "code"
+INTERPOLATION = "interpolation"
+SELECTOR = "selector"
+OBJC_NAME = "objc"
+
+# Keyword-like tokens whose parenthesised arguments get their own context
+CALL_CONTEXTS = {
+    "#selector": SELECTOR,
+    "#keyPath": SELECTOR,
+    "@objc": OBJC_NAME,
+}
+CALL_CONTEXTS_BYTES = {keyword.encode('ascii'): context for keyword, context in CALL_CONTEXTS.items()}
+
+class Identifier(NamedTuple):
+    name: str
+    start: int
+    end: int
+    context: str
+
+CODE_SOURCE = r'''
+      (?P<ident>IDENT)
+    | (?P<number>\d\w*)
+    | (?P<keyword>[\#@]IDENT)(?P<call>\s*\()?
+    | (?P<line_comment>//)
+    | (?P<block_comment>/\*)
+    | (?P<string>(?P<hashes>\#*)(?P<quotes>"""|"))
+    | (?P<open>[(\[{])
+    | (?P<close>[)\]}])
+'''
+CODE_PATTERN = re.compile(CODE_SOURCE.replace('IDENT', r'[^\W\d]\w*'), re.VERBOSE)
+CODE_PATTERN_BYTES = re.compile(CODE_SOURCE.replace('IDENT', r'[A-Za-z_\x80-\xff][A-Za-z0-9_\x80-\xff]*').encode('ascii'),
+                                re.VERBOSE)
+
+BLOCK_COMMENT_PATTERN = re.compile(r'(?P<open>/\*)|\*/')
+BLOCK_COMMENT_PATTERN_BYTES = re.compile(rb'(?P<open>/\*)|\*/')
+
+_string_patterns = {}
+
+def string_pattern(hashes: int, multiline: bool, binary: bool = False):
+    """Pattern finding the next escape, interpolation or end of a string literal."""
+    key = (hashes, multiline, binary)
+    if key not in _string_patterns:
+        escape = re.escape('\\' + '#' * hashes)
+        close = re.escape(('"""' if multiline else '"') + '#' * hashes)
+        # An unterminated single-line literal ends at the newline so the scan can resync
+        newline = '' if multiline else r'|(?P<newline>\n)'
+        source = escape + r'(?:(?P<interp>\()|.)|(?P<close>' + close + ')' + newline
+        _string_patterns[key] = re.compile(source.encode('ascii') if binary else source, re.DOTALL)
+    return _string_patterns[key]
+
+def skip_block_comment(text, pos: int) -> int:
+    """Return the position after the (possibly nested) block comment opened before pos."""
+    depth = 1
+    pattern = BLOCK_COMMENT_PATTERN if isinstance(text, str) else BLOCK_COMMENT_PATTERN_BYTES
+    for match in pattern.finditer(text, pos):
+        depth += 1 if match.lastgroup == 'open' else -1
+        if depth == 0:
+            return match.end()
+    return len(text)
+
+def iter_identifiers(text, structure: bool = False) -> Iterator[Identifier]:
+    """Yield every identifier of a Swift source with its lexical context.
+
+    With structure, also yield '@attribute' / '#directive' tokens and every
+    code bracket ('(', '{', ']', ...) as Identifier tuples named after them;
+    an attribute with arguments is followed by its '('.
+    """
+    # Each open bracket pushes (context to restore, string pattern to resume);
+    # the string pattern is set only for the ")" that closes an interpolation.
+    binary = not isinstance(text, str)
+    code_pattern = CODE_PATTERN_BYTES if binary else CODE_PATTERN
+    call_contexts = CALL_CONTEXTS_BYTES if binary else CALL_CONTEXTS
+    newline_char = b'\n' if binary else '\n'
+    open_paren = b'(' if binary else '('
+    stack = []
+    context = CODE
+    literal = None
+    pos = 0
+    length = len(text)
+
+    while pos < length:
+        if literal is not None:
+            match = literal.search(text, pos)
+            if match is None:
+                return
+            pos = match.end()
+            if match.lastgroup == 'interp':
+                stack.append((context, literal))
+                context = INTERPOLATION
+                literal = None
+            elif match.lastgroup in ('close', 'newline'):
+                literal = None
+            continue
+
+        match = code_pattern.search(text, pos)
+        if match is None:
+            return
+        kind = match.lastgroup
+        pos = match.end()
+
+        if kind == 'ident':
+            yield Identifier(match.group(), match.start(), pos, context)
+        elif kind == 'open':
+            if structure:
+                yield Identifier(match.group(), match.start(), pos, context)
+            stack.append((context, None))
+        elif kind == 'close':
+            if stack:
+                if structure and stack[-1][1] is None:
+                    yield Identifier(match.group(), match.start(), pos, context)
+                context, literal = stack.pop()
+            elif structure:
+                yield Identifier(match.group(), match.start(), pos, context)
+        elif kind == 'call':
+            if structure:
+                keyword = match.group('keyword')
+                yield Identifier(keyword, match.start(), match.end('keyword'), context)
+                yield Identifier(open_paren, pos - 1, pos, context)
+            stack.append((context, None))
+            context = call_contexts.get(match.group('keyword'), context)
+        elif kind == 'keyword':
+            if structure:
+                yield Identifier(match.group(), match.start(), pos, context)
+        elif kind == 'line_comment':
+            newline = text.find(newline_char, pos)
+            pos = length if newline < 0 else newline + 1
+        elif kind == 'block_comment':
+            pos = skip_block_comment(text, pos)
+        elif kind == 'string':
+            literal = string_pattern(len(match.group('hashes')), len(match.group('quotes')) == 3, binary)
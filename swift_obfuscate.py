@@ -3,29 +3,71 @@
 Swift Method Name Obfuscator
 ----------------------------
 Usage:
-    python3 swift_obfuscate.py <target_directory> [--prefix PREFIX] [--dry-run] [--map-file MAP_JSON]
+    python3 swift_obfuscate.py <target_directory> [--prefix PREFIX] [--dry-run] [--map-file MAP_JSON] [--full] [--seed KEY] [--jobs N] [--index [INDEX_DB]] [--sdk-symbols SDK_SET]
+                                              [--report REPORT_JSON] [--diff DIFF_FILE]
+                                              [--watch OUTPUT_DIR [--poll]] [--shared]
 
 Arguments:
     target_directory   Path to directory containing .swift files to obfuscate
     --prefix           Prefix for obfuscated names (default: 'ox')
     --dry-run          Preview changes without modifying files
-    --map-file         Path to save/load a JSON mapping file (default: obfuscation_map.json beside target dir)
-    --skip             Comma-separated additional method names to skip
+    --map-file         Path to save/load a JSON mapping file (default: obfuscation_map.json beside target dir),
+                       or a compact map store (*.oxmap, see map_store.py) of which only the tree's names are read
+    --skip             Comma-separated additional method names to skip; names already in the map are left out
+                       of the mapping applied to the tree (renamed back where an earlier run renamed them)
+                       and out of a saved JSON map (entries of a *.oxmap store or --shared map stay)
+    --full             Ignore the manifest beside the map file and reprocess every file
+    --seed             Secret key: derive each obfuscated name from a keyed hash of the original,
+                       so repeated runs on the same sources produce the same names
+    --jobs             Number of worker processes for scanning and rewriting (default: 1, 0 = one per CPU)
+    --index            Extract names from the incremental symbol index (swift_symbol_index.py), which also
+                       leaves out overrides and other names bound to Apple APIs
+                       (default path: obfuscation_map.index.sqlite beside the map file)
+    --sdk-symbols      Never rename names the SDK declares: a .sdkset built by sdk_symbols.py, or
+                       .swiftinterface / header / symbol-list files and directories (repeatable)
+    --report           Write a JSON report of replacements per identifier and per file
+    --diff             Write a unified diff of every rewrite (with --dry-run: of what would change)
+    --watch            Leave the sources alone and keep an obfuscated mirror of them in OUTPUT_DIR up to date,
+                       re-emitting each file as it is saved; new func names are added to the map (swift_watch.py)
+    --poll             With --watch, poll the tree instead of using inotify
+    --shared           The map file is shared by runs that may overlap (e.g. parallel CI jobs): new names are
+                       merged into it under a file lock (<map_file>.lock), keeping other runs' entries and
+                       unique obfuscated names; with a *.oxmap store the lock is held for milliseconds
 
 Examples:
     python3 swift_obfuscate.py ./wldo/cc
     python3 swift_obfuscate.py ./wldo/cc --prefix zz --map-file ./my_map.json
     python3 swift_obfuscate.py ./AnotherProject/src --map-file ./my_map.json  # reuse same map
+    python3 swift_obfuscate.py ./AppA --map-file /shared/portfolio.oxmap --shared  # concurrent CI jobs
+    python3 swift_obfuscate.py ./wldo --jobs 16
+    python3 swift_obfuscate.py ./wldo/cc --seed "$OBFUSCATION_SEED"  # reproducible names
+    python3 swift_obfuscate.py ./wldo --index --dry-run
+    python3 swift_obfuscate.py ./wldo --sdk-symbols ios.sdkset
+    python3 swift_obfuscate.py ./wldo --dry-run --report report.json --diff preview.diff
+    python3 swift_obfuscate.py ./wldo --watch ./build/wldo-obfuscated --seed "$OBFUSCATION_SEED"
 """
 
 import os
 import re
 import sys
 import json
+import time
+import mmap
+import difflib
+import hmac
+import hashlib
 import random
 import string
+import shutil
 import argparse
+import tempfile
 from pathlib import Path
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from swift_lexer import iter_identifiers, CODE, INTERPOLATION, SELECTOR, OBJC_NAME
+from map_store import MapStore, is_store, map_lock, save_map
 
 # ─── System Swift / UIKit methods to NEVER obfuscate ────────────────────────
 SYSTEM_METHODS = {
@@ -52,67 +94,522 @@ SYSTEM_METHODS = {
     "willSet", "didSet", "get", "set",
 }
 
+# Identifier contexts apply_obfuscation rewrites (see swift_lexer)
+REWRITE_CONTEXTS = {CODE, INTERPOLATION, SELECTOR}
+
+# What may follow a declared func name: its parameter list or generic clause
+FUNC_NAME_END = re.compile(r'\s*[(<]')
+FUNC_NAME_END_BYTES = re.compile(rb'\s*[(<]')
+
 def random_name(prefix: str, length: int = 8) -> str:
     """Generate a random obfuscated name like ox_a3Fk9mXz"""
     chars = string.ascii_letters + string.digits
     suffix = ''.join(random.choices(chars, k=length))
     return f"{prefix}_{suffix}"
 
-def extract_method_names(directory: str) -> set:
-    """Extract all func names from .swift files, excluding system methods."""
+def seeded_name(prefix: str, seed: str, name: str, attempt: int = 0, length: int = 8) -> str:
+    """Derive a reproducible obfuscated name from a keyed hash of the original name."""
+    chars = string.ascii_letters + string.digits
+    message = name if attempt == 0 else f"{name}#{attempt}"
+    value = int.from_bytes(hmac.new(seed.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).digest(), 'big')
+    suffix = []
+    for _ in range(length):
+        value, index = divmod(value, len(chars))
+        suffix.append(chars[index])
+    return f"{prefix}_{''.join(suffix)}"
+
+class SourceInfo(NamedTuple):
+    declared: frozenset      # func names declared in the source
+    objc_names: frozenset    # names referenced from #selector/@objc
+    identifiers: frozenset   # identifiers apply_obfuscation may rewrite
+
+def scan_edits(text, mapping: dict = None, counts: dict = None, emit=None) -> tuple:
+    """Scan one source and list the replacements a mapping makes in it.
+
+    text is a str with a str mapping, or raw bytes / an mmap with a bytes
+    mapping, which is scanned without ever being decoded. Returns
+    (edits, SourceInfo): edits are (start, end, replacement) in order, and
+    the info describes the text as it is after the edits. With emit, each
+    edit is passed to it as found instead of being listed (edits is None).
+    counts, when given, is incremented by the replacements of each original name.
+
+    Only identifiers in code are looked up, so string literals, comments and
+    explicit @objc(...) names are never touched. #selector arguments are code
+    references checked by the compiler and are rewritten with their declaration.
+    """
+    binary = not isinstance(text, str)
+    func_keyword = b'func' if binary else 'func'
+    func_name_end = FUNC_NAME_END_BYTES if binary else FUNC_NAME_END
+    declared, objc_names, identifiers = set(), set(), set()
+    edits = [] if emit is None else None
+    emit = emit or edits.append
+    previous_name = previous = None
+    for token in iter_identifiers(text):
+        name = token.name
+        if token.context in REWRITE_CONTEXTS:
+            obfuscated_name = mapping.get(name) if mapping else None
+            if obfuscated_name is not None and obfuscated_name != name:
+                if counts is not None:
+                    counts[name] = counts.get(name, 0) + 1
+                emit((token.start, token.end, obfuscated_name))
+                name = obfuscated_name
+            identifiers.add(name)
+        if token.context in (SELECTOR, OBJC_NAME):
+            objc_names.add(name)
+        elif (previous_name == func_keyword and previous.context == token.context
+              and text[previous.end:token.start].isspace() and func_name_end.match(text, token.end)):
+            declared.add(name)
+        previous_name, previous = name, token
+    if binary:
+        declared, objc_names, identifiers = (
+            {name.decode('utf-8', errors='replace') for name in names} for names in (declared, objc_names, identifiers))
+    return edits, SourceInfo(frozenset(declared), frozenset(objc_names), frozenset(identifiers))
+
+def splice(text, edits: list):
+    """text with the edits of scan_edits applied"""
+    if not edits:
+        return text
+    pieces = []
+    last = 0
+    for start, end, replacement in edits:
+        pieces.append(text[last:start])
+        pieces.append(replacement)
+        last = end
+    pieces.append(text[last:])
+    return ('' if isinstance(text, str) else b'').join(pieces)
+
+def scan_source(text: str, mapping: dict = None, counts: dict = None) -> tuple:
+    """Scan one source, rewriting it when a mapping is given.
+
+    Returns (text, SourceInfo), where the info describes the returned text.
+    """
+    edits, info = scan_edits(text, mapping, counts)
+    return splice(text, edits), info
+
+def build_rewriter(mapping: dict):
+    """Compile a mapping into a function that rewrites a text in a single pass."""
+    def rewrite(text: str) -> str:
+        return scan_source(text, mapping)[0]
+    return rewrite
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def mapping_digest(mapping: dict, identifiers) -> str:
+    """Digest of the mapping entries that can affect a file with these identifiers."""
+    entries = sorted((name, mapping[name]) for name in identifiers if name in mapping)
+    return hashlib.sha256(json.dumps(entries).encode('utf-8')).hexdigest()
+
+def manifest_path(map_file: str) -> str:
+    """Manifest stored beside the map: obfuscation_map.json -> obfuscation_map.manifest.json"""
+    return os.path.splitext(map_file)[0] + ".manifest.json"
+
+class Manifest:
+    """Content hashes and scan results of every processed file, kept beside the map.
+
+    A file is skipped when its content still hashes to what the last run left
+    on disk and the mapping entries for its identifiers are unchanged.
+    """
+    VERSION = 1
+
+    def __init__(self, path: str, files: dict = None):
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self.files = files or {}
+        self.previous = dict(self.files)
+        self.prefix = ''
+
+    @classmethod
+    def load(cls, path: str) -> "Manifest":
+        files = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            # A manifest written by another version may describe different scan results
+            if data.get("version") == cls.VERSION:
+                files = data.get("files", {})
+        return cls(path, files)
+
+    def key(self, path: Path) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def begin(self, directory: str):
+        """Forget entries under directory; files that still exist are recorded again."""
+        prefix = self.key(directory)
+        self.prefix = prefix = '' if prefix == os.curdir else prefix + os.sep
+        self.files = {key: entry for key, entry in self.files.items() if not key.startswith(prefix)}
+
+    def entry(self, path: Path):
+        """Entry the previous run recorded for path, or None."""
+        return self.previous.get(self.key(path))
+
+    def keep(self, path: Path):
+        key = self.key(path)
+        self.files[key] = self.previous[key]
+
+    def record(self, path: Path, digest: str, info: SourceInfo, mapping: dict):
+        self.files[self.key(path)] = {
+            "sha256": digest,
+            "map": mapping_digest(mapping, info.identifiers),
+            "declared": sorted(info.declared),
+            "objc": sorted(info.objc_names),
+            "identifiers": sorted(info.identifiers),
+        }
+
+    def save(self, merge: bool = False):
+        """Write the manifest atomically.
+
+        With merge (under the map lock), entries other runs recorded since the
+        load are kept for everything outside the directory passed to begin().
+        """
+        files = self.files
+        if merge:
+            files = {key: entry for key, entry in Manifest.load(self.path).files.items()
+                     if not key.startswith(self.prefix)}
+            files.update((key, entry) for key, entry in self.files.items() if key.startswith(self.prefix))
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({"version": self.VERSION, "files": files}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+def entry_info(entry: dict) -> SourceInfo:
+    return SourceInfo(frozenset(entry["declared"]), frozenset(entry["objc"]), frozenset(entry["identifiers"]))
+
+def swift_files(directory: str) -> list:
+    return sorted(Path(directory).rglob("*.swift"))
+
+@contextmanager
+def mapped(path: Path):
+    """Read-only memory map of a file (b'' for an empty one, which cannot be mapped)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+class EditWriter:
+    """Streams a mapped file with edits applied into a temporary file beside it.
+
+    Unchanged spans are written straight from the buffer as each edit
+    arrives, so neither the text nor the edits are ever held whole. The file
+    is only created at the first edit and swapped in atomically by finish().
+    A symlinked source is rewritten at its target; a hard-linked one is
+    written through in place, so every link sees the result.
+    """
+
+    def __init__(self, path: Path, buffer):
+        self.path = Path(os.path.realpath(path))
+        self.buffer = buffer
+        self.view = None
+        self.out = None
+        self.last = 0
+        self.digest = hashlib.sha256()
+
+    def _write(self, piece):
+        self.out.write(piece)
+        self.digest.update(piece)
+
+    def __call__(self, edit: tuple):
+        start, end, replacement = edit
+        if self.out is None:
+            self.view = memoryview(self.buffer)
+            self.out = tempfile.NamedTemporaryFile(dir=self.path.parent, prefix='.' + self.path.name + '.', delete=False)
+        self._write(self.view[self.last:start])
+        self._write(replacement)
+        self.last = end
+
+    def finish(self) -> str:
+        """Swap the rewritten file in. Returns its digest, or None if there was no edit."""
+        if self.out is None:
+            return None
+        self._write(self.view[self.last:])
+        self.close()
+        stat = os.stat(self.path)
+        if stat.st_nlink > 1:
+            # Replacing would detach this name from the file's other links
+            shutil.copyfile(self.out.name, self.path)
+            os.unlink(self.out.name)
+        else:
+            os.chmod(self.out.name, stat.st_mode & 0o7777)
+            os.replace(self.out.name, self.path)
+        return self.digest.hexdigest()
+
+    def close(self):
+        if self.out is not None:
+            self.view.release()
+            self.out.close()
+
+    def abort(self):
+        if self.out is not None:
+            self.close()
+            os.unlink(self.out.name)
+
+# Mapping used by rewrite_file, installed once per worker process (and encoded for byte scans)
+_worker_mapping = None
+_worker_mapping_bytes = None
+
+def init_worker(mapping: dict):
+    global _worker_mapping, _worker_mapping_bytes
+    _worker_mapping = mapping
+    _worker_mapping_bytes = ({name.encode('utf-8'): value.encode('utf-8') for name, value in mapping.items()}
+                             if mapping is not None else None)
+
+def run_tasks(function, tasks: list, jobs: int = 1, mapping: dict = None):
+    """Yield function(task) for every task in order, fanned out over jobs processes."""
+    if jobs <= 1:
+        init_worker(mapping)
+        yield from map(function, tasks)
+        return
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(mapping,)) as executor:
+        yield from executor.map(function, tasks, chunksize=chunksize)
+
+def scan_file(task: tuple) -> SourceInfo:
+    """Scan one file, or return None when it still hashes to the cached digest."""
+    path, cached_digest = task
+    with mapped(path) as buffer:
+        if cached_digest is not None and file_digest(buffer) == cached_digest:
+            return None
+        return scan_edits(buffer)[1]
+
+def rewrite_file(task: tuple):
+    """Rewrite one file with the worker's mapping.
+
+    Returns None when the cached manifest entry is still current, otherwise
+    (digest of the content left on disk, SourceInfo of it, whether it changed,
+    replacements per original name, unified diff or None). The diff is only
+    built when asked for, under the given relative name.
+    """
+    path, cached, dry_run, diff_name = task
+    with mapped(path) as buffer:
+        digest = file_digest(buffer)
+        if (cached is not None and cached["sha256"] == digest
+                and cached["map"] == mapping_digest(_worker_mapping, cached["identifiers"])):
+            return None
+
+        # The map is scanned and copied as raw bytes, so any encoding round-trips exactly
+        counts = {}
+        edits = [] if diff_name is not None else None
+        writer = None if dry_run else EditWriter(path, buffer)
+
+        def emit(edit):
+            if edits is not None:
+                edits.append(edit)
+            if writer is not None:
+                writer(edit)
+
+        try:
+            info = scan_edits(buffer, _worker_mapping_bytes, counts, emit)[1]
+            changed = bool(counts)
+            diff = None
+            if changed and diff_name is not None:
+                # Before finish(): a hard-linked file is rewritten in place, under the map
+                original = buffer[:].decode('utf-8', errors='replace')
+                modified_text = splice(buffer[:], edits).decode('utf-8', errors='replace')
+                diff = ''.join(difflib.unified_diff(original.splitlines(keepends=True),
+                                                    modified_text.splitlines(keepends=True),
+                                                    f"a/{diff_name}", f"b/{diff_name}"))
+            if writer is not None and changed:
+                digest = writer.finish()
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+    counts = {name.decode('utf-8'): count for name, count in counts.items()}
+    return digest, info, changed, counts, diff
+
+def extract_method_names(directory: str, manifest: Manifest = None, jobs: int = 1, sdk=None) -> set:
+    """Extract all func names from .swift files, excluding system methods and ObjC-visible names.
+
+    sdk is an optional set of SDK names (see sdk_symbols.py) that are never renamed.
+    """
+    return select_method_names(scan_tree(directory, manifest, jobs), sdk)
+
+def scan_tree(directory: str, manifest: Manifest = None, jobs: int = 1) -> list:
+    """SourceInfo of every .swift file, from the manifest for files that did not change"""
+    paths = swift_files(directory)
+    entries = [manifest.entry(path) if manifest else None for path in paths]
+    tasks = [(path, entry["sha256"] if entry else None) for path, entry in zip(paths, entries)]
+    return [entry_info(entry) if info is None else info
+            for entry, info in zip(entries, run_tasks(scan_file, tasks, jobs))]
+
+def is_renamable(name, sdk=None) -> bool:
+    """Whether a declared func name may be renamed (selector targets aside)."""
+    return name not in SYSTEM_METHODS and not name.startswith('_') and (sdk is None or name not in sdk)
+
+def select_method_names(infos, sdk=None) -> set:
+    """Renamable func names declared across the SourceInfos of a tree."""
     method_names = set()
-    pattern = re.compile(r'\bfunc\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[\(<]')
-    
-    for path in Path(directory).rglob("*.swift"):
-        text = path.read_text(encoding='utf-8', errors='ignore')
-        for match in pattern.finditer(text):
-            name = match.group(1)
-            if name not in SYSTEM_METHODS and not name.startswith('_'):
-                method_names.add(name)
+    objc_names = set()
+    for info in infos:
+        objc_names |= info.objc_names
+        method_names.update(name for name in info.declared if is_renamable(name, sdk))
     
-    return method_names
+    # Selector targets are dispatched through the ObjC runtime; leave them alone
+    return method_names - objc_names
+
+class UsedNames:
+    """A set of obfuscated names backed by a second container of names that are also taken."""
+
+    def __init__(self, names: set, taken):
+        self.names = names
+        self.taken = taken
 
-def build_mapping(method_names: set, prefix: str, existing_map: dict = None) -> dict:
-    """Build or extend a name -> obfuscated_name mapping."""
+    def __contains__(self, name) -> bool:
+        return name in self.names or name in self.taken
+
+    def add(self, name):
+        self.names.add(name)
+
+def build_mapping(method_names: set, prefix: str, existing_map: dict = None, seed: str = None,
+                  taken=None) -> dict:
+    """Build or extend a name -> obfuscated_name mapping.
+
+    With a seed, every name is derived from a keyed hash of the original, so the
+    same sources always get the same names, with or without a saved map.
+    taken holds obfuscated names of entries left out of existing_map (a map
+    store's entries for other trees); new names never collide with them.
+    """
     mapping = dict(existing_map) if existing_map else {}
     used_values = set(mapping.values())
+    if taken is not None:
+        used_values = UsedNames(used_values, taken)
     
     for name in sorted(method_names):
-        if name not in mapping:
-            # Generate a unique random name
-            candidate = random_name(prefix)
-            while candidate in used_values:
+        # Names that are already obfuscated come from an earlier run over this tree
+        if name not in mapping and name not in used_values:
+            if seed is not None:
+                # Collisions rehash with a counter, which is just as reproducible
+                attempt = 0
+                candidate = seeded_name(prefix, seed, name)
+                while candidate in used_values:
+                    attempt += 1
+                    candidate = seeded_name(prefix, seed, name, attempt)
+            else:
+                # Generate a unique random name
                 candidate = random_name(prefix)
+                while candidate in used_values:
+                    candidate = random_name(prefix)
             mapping[name] = candidate
             used_values.add(candidate)
     
     return mapping
 
-def apply_obfuscation(directory: str, mapping: dict, dry_run: bool = False) -> int:
-    """Apply obfuscation mapping to all .swift files. Returns number of files modified."""
+def save_shared(map_file: str, method_names: set, existing_map: dict, prefix: str, seed: str = None,
+                store: MapStore = None) -> tuple:
+    """Extend a map that other runs may be extending at the same time.
+
+    Under the exclusive map lock the map is read again: names another run has
+    mapped since keep that run's obfuscated name, and the remaining new names
+    are drawn against every obfuscated name now in the map, so they stay unique
+    across runs. Scanning and rewriting happen outside the lock.
+
+    Returns (mapping, names added by this run, names adopted from other runs,
+    seconds the lock was held).
+    """
+    with map_lock(map_file):
+        start = time.perf_counter()
+        if store is not None:
+            store.reload()
+            current = store.lookup(name for name in method_names if name not in existing_map)
+            merged = dict(existing_map)
+            merged.update(current)
+            mapping = build_mapping(method_names, prefix, merged, seed=seed, taken=store.obfuscated)
+            added = mapping.keys() - merged.keys()
+            store.add({name: mapping[name] for name in added})
+        else:
+            current = {}
+            if os.path.exists(map_file):
+                with open(map_file, 'r') as f:
+                    current = json.load(f)
+            merged = dict(existing_map)
+            merged.update(current)
+            mapping = build_mapping(method_names, prefix, merged, seed=seed)
+            added = mapping.keys() - merged.keys()
+            save_map(map_file, mapping)
+        held = time.perf_counter() - start
+    adopted = {name for name in method_names if name in current and name not in existing_map}
+    return mapping, added, adopted, held
+
+def revert_skipped(mapping: dict, names) -> dict:
+    """Take names out of mapping. Returns {obfuscated: original} for them, which puts
+    the original names back where an earlier run already renamed them."""
+    return {mapping.pop(name): name for name in sorted(names) if name in mapping}
+
+def apply_obfuscation(directory: str, mapping: dict, dry_run: bool = False,
+                      manifest: Manifest = None, jobs: int = 1, report: "RewriteReport" = None) -> int:
+    """Apply obfuscation mapping to all .swift files. Returns number of files modified.
+
+    With a manifest, files it reports as current are skipped and every other
+    file is recorded as left on disk. With a report, the replacements (and
+    diffs, if it has a diff stream) of every file are added to it as they come.
+    """
     modified = 0
     
-    # Sort by length desc to avoid partial replacement (longer names first)
-    sorted_pairs = sorted(mapping.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    for path in Path(directory).rglob("*.swift"):
-        original = path.read_text(encoding='utf-8', errors='ignore')
-        modified_text = original
-        
-        for original_name, obfuscated_name in sorted_pairs:
-            # Only replace when the name is used as a function call or declaration
-            # Uses word boundary patterns to avoid partial matches
-            pattern = re.compile(r'\b' + re.escape(original_name) + r'\b')
-            modified_text = pattern.sub(obfuscated_name, modified_text)
-        
-        if modified_text != original:
-            if not dry_run:
-                path.write_text(modified_text, encoding='utf-8')
+    paths = swift_files(directory)
+    want_diff = report is not None and report.diff is not None
+    tasks = [(path, manifest.entry(path) if manifest else None, dry_run,
+              Path(os.path.relpath(path, directory)).as_posix() if want_diff else None) for path in paths]
+    for path, result in zip(paths, run_tasks(rewrite_file, tasks, jobs, mapping)):
+        if report is not None:
+            report.scanned += 1
+        if result is None:
+            manifest.keep(path)
+            continue
+
+        digest, info, changed, counts, diff = result
+        if report is not None:
+            report.add(os.path.relpath(path, directory), counts, diff)
+        if changed:
             modified += 1
             print(f"  {'[DRY RUN] Would modify' if dry_run else 'Modified'}: {path.name}")
+        if manifest and not dry_run:
+            manifest.record(path, digest, info, mapping)
     
     return modified
 
+class RewriteReport:
+    """Replacement statistics of one apply_obfuscation run, filled file by file.
+
+    Diffs go straight to the diff stream, so no rewritten text is kept.
+    """
+
+    def __init__(self, directory: str, mapping: dict, dry_run: bool, diff=None):
+        self.directory = directory
+        self.mapping = mapping
+        self.dry_run = dry_run
+        self.diff = diff
+        self.scanned = 0
+        self.files = {}
+        self.identifiers = {}
+
+    def add(self, path: str, counts: dict, diff: str = None):
+        if not counts:
+            return
+        self.files[Path(path).as_posix()] = {"replacements": sum(counts.values()), "identifiers": counts}
+        for name, count in counts.items():
+            entry = self.identifiers.setdefault(name, {"obfuscated": self.mapping[name], "replacements": 0, "files": 0})
+            entry["replacements"] += count
+            entry["files"] += 1
+        if diff:
+            self.diff.write(diff)
+
+    def to_dict(self) -> dict:
+        return {
+            "directory": self.directory,
+            "dry_run": self.dry_run,
+            "files_scanned": self.scanned,
+            "files_changed": len(self.files),
+            "replacements": sum(entry["replacements"] for entry in self.files.values()),
+            "identifiers": self.identifiers,
+            "files": self.files,
+        }
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+
 def main():
     parser = argparse.ArgumentParser(description="Swift Method Name Obfuscator")
     parser.add_argument("directory", help="Target directory containing .swift files")
@@ -120,6 +617,16 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Preview changes without modifying files")
     parser.add_argument("--map-file", default=None, help="Path to save/load JSON mapping file")
     parser.add_argument("--skip", default="", help="Comma-separated extra method names to skip")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and reprocess every file")
+    parser.add_argument("--seed", default=None, help="Secret key for reproducible names derived from each original name")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for scanning and rewriting (default: 1, 0 = one per CPU)")
+    parser.add_argument("--index", nargs="?", const="", default=None, help="Extract names from the persistent symbol index")
+    parser.add_argument("--sdk-symbols", action="append", default=[], help="SDK symbol set or sources whose names are never renamed")
+    parser.add_argument("--report", default=None, help="Write a JSON report of replacements per identifier and file")
+    parser.add_argument("--diff", default=None, help="Write a unified diff of the rewrites")
+    parser.add_argument("--watch", default=None, metavar="OUTPUT_DIR", help="Keep an obfuscated mirror of the tree up to date")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll instead of using inotify")
+    parser.add_argument("--shared", action="store_true", help="Merge into a map other runs may be writing at the same time")
     args = parser.parse_args()
 
     target_dir = os.path.abspath(args.directory)
@@ -128,33 +635,108 @@ def main():
         sys.exit(1)
 
     # Add user-specified skip names
-    if args.skip:
-        for name in args.skip.split(","):
-            SYSTEM_METHODS.add(name.strip())
+    skip_names = {name.strip() for name in args.skip.split(",") if name.strip()}
+    SYSTEM_METHODS.update(skip_names)
+
+    jobs = args.jobs or os.cpu_count()
 
     # Determine map file path
     map_file = args.map_file or os.path.join(os.path.dirname(target_dir), "obfuscation_map.json")
 
     # Load existing map if present
     existing_map = {}
-    if os.path.exists(map_file):
+    store = None
+    if is_store(map_file):
+        # Only the entries of names that occur in the tree are looked up, after the scan
+        try:
+            with map_lock(map_file, exclusive=False) if args.shared else nullcontext():
+                store = MapStore(map_file)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: cannot open map store: {e}")
+            sys.exit(1)
+        print(f"📂 Opened map store: {map_file} ({len(store):,} entries)")
+    elif os.path.exists(map_file):
         with open(map_file, 'r') as f:
             existing_map = json.load(f)
         print(f"📂 Loaded existing mapping from: {map_file} ({len(existing_map)} entries)")
 
+    # The manifest lets unchanged files skip both the scan and the rewrite
+    manifest = Manifest.load(manifest_path(map_file))
+    if args.full:
+        manifest.previous.clear()
+    manifest.begin(target_dir)
+
+    sdk = None
+    if args.sdk_symbols:
+        from sdk_symbols import load_symbols
+        try:
+            sdk = load_symbols(args.sdk_symbols)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: cannot load SDK symbols: {e}")
+            sys.exit(1)
+        print(f"📚 Loaded {len(sdk):,} SDK names")
+
+    if args.watch:
+        output_dir = os.path.abspath(args.watch)
+        if args.dry_run or args.shared or os.path.commonpath([output_dir, target_dir]) in (output_dir, target_dir):
+            print("❌ Error: --watch needs an output directory outside the target directory, and no --dry-run or --shared.")
+            sys.exit(1)
+        from swift_watch import watch
+        watch(target_dir, output_dir, existing_map, map_file, args.prefix, seed=args.seed, sdk=sdk, poll=args.poll,
+              store=store)
+        return
+
     print(f"\n🔍 Scanning .swift files in: {target_dir}")
-    method_names = extract_method_names(target_dir)
-    new_names = method_names - set(existing_map.keys())
+    index = None
+    if args.index is not None:
+        from swift_symbol_index import SymbolIndex, index_path
+        index = SymbolIndex(args.index or index_path(map_file))
+        parsed, total = index.update(target_dir, jobs=jobs, full=args.full)
+        print(f"   Symbol index: {index.path} ({parsed} of {total} file(s) parsed)")
+        method_names = index.method_names(target_dir, sdk=sdk)
+        pinned = sorted(index.pinned_names(target_dir) - SYSTEM_METHODS)
+        if pinned:
+            print(f"   🔒 Left {len(pinned)} override/IB/protocol name(s) alone that SYSTEM_METHODS misses: "
+                  f"{', '.join(pinned[:10])}{' …' if len(pinned) > 10 else ''}")
+    else:
+        infos = scan_tree(target_dir, manifest, jobs)
+        method_names = select_method_names(infos, sdk)
+    used = set(existing_map.values())
+    if store is not None:
+        names = index.names(target_dir) if index is not None else set().union(*(info.identifiers for info in infos))
+        existing_map = store.lookup(names | method_names)
+        used = store.obfuscated
+    new_names = {name for name in method_names if name not in existing_map and name not in used}
     print(f"   Found {len(method_names)} unique method names ({len(new_names)} new, {len(method_names) - len(new_names)} already mapped)")
 
     # Build mapping
-    mapping = build_mapping(method_names, args.prefix, existing_map)
+    if args.shared and not args.dry_run:
+        # Reload, merge and save under the map lock, so concurrent runs keep each other's entries
+        mapping, added, adopted, held = save_shared(map_file, method_names, existing_map, args.prefix,
+                                                    seed=args.seed, store=store)
+        print(f"\n💾 {len(added)} new mapping(s) merged into shared map: {map_file} (lock held {held * 1000:.1f} ms)")
+        if adopted:
+            print(f"   🤝 {len(adopted)} name(s) were mapped by another run meanwhile; using its names")
+        # Other runs may still use the skipped entries of a shared map, so they stay in it
+        reverted = revert_skipped(mapping, skip_names)
+    else:
+        mapping = build_mapping(method_names, args.prefix, existing_map, seed=args.seed,
+                                taken=store.obfuscated if store is not None else None)
+        # Not saved to a JSON map; a store is append-only, so its entries stay
+        reverted = revert_skipped(mapping, skip_names)
 
-    # Save map
-    if not args.dry_run:
-        with open(map_file, 'w') as f:
-            json.dump(mapping, f, indent=2, sort_keys=True)
-        print(f"\n💾 Mapping saved to: {map_file}")
+        # Save map
+        if not args.dry_run and store is not None:
+            # Only the new entries are written, to the store's log
+            store.add({name: mapping[name] for name in new_names})
+            print(f"\n💾 {len(new_names)} new mapping(s) saved to: {map_file}")
+        elif not args.dry_run:
+            save_map(map_file, mapping)
+            print(f"\n💾 Mapping saved to: {map_file}")
+
+    if reverted:
+        print(f"\n↩️  {len(reverted)} skipped name(s) left out of the mapping and restored where already renamed: "
+              f"{', '.join(sorted(reverted.values())[:10])}")
 
     # Print sample
     print(f"\n📋 Sample mapping (first 10):")
@@ -162,15 +744,46 @@ def main():
         print(f"   {orig:40s} → {obf}")
 
     # Apply
+    mapping.update(reverted)
     print(f"\n{'🔍 [DRY RUN] ' if args.dry_run else ''}⚙️  Applying obfuscation...")
-    count = apply_obfuscation(target_dir, mapping, dry_run=args.dry_run)
+    report = None
+    if args.report or args.diff:
+        diff = open(args.diff, 'w') if args.diff else None
+        report = RewriteReport(target_dir, mapping, args.dry_run, diff)
+    try:
+        count = apply_obfuscation(target_dir, mapping, dry_run=args.dry_run, manifest=manifest, jobs=jobs, report=report)
+    finally:
+        if report is not None and report.diff is not None:
+            report.diff.close()
     print(f"\n✅ {'Would modify' if args.dry_run else 'Modified'} {count} file(s).")
+    if report is not None:
+        summary = report.to_dict()
+        print(f"   {summary['replacements']} replacement(s) of {len(summary['identifiers'])} name(s) "
+              f"in {summary['files_changed']} of {summary['files_scanned']} file(s).")
+        if args.report:
+            report.save(args.report)
+            print(f"📝 Report: {args.report}")
+        if args.diff:
+            print(f"📝 Diff: {args.diff}")
+    if args.shared and not args.dry_run:
+        with map_lock(map_file):
+            manifest.save(merge=True)
+    elif not args.dry_run:
+        manifest.save()
+
+    if index is not None:
+        sites, files = index.reference_counts(target_dir, mapping.keys())
+        print(f"   {sites} reference site(s) in {files} file(s) {'would be' if args.dry_run else 'were'} renamed.")
+        index.close()
+    if store is not None:
+        store.close()
 
     if args.dry_run:
         print("\n💡 Run without --dry-run to apply changes.")
     else:
         print(f"\n🗺️  Obfuscation map: {map_file}")
         print("   Keep this file safe — you'll need it to reverse-engineer or extend the obfuscation.")
+        print(f"   Restore names in crash logs: python3 swift_deobfuscate.py log {map_file} crash.log")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Swift Symbol Index
+------------------
+Usage:
+    python3 swift_symbol_index.py <target_directory> [--index INDEX_DB] [--full] [--jobs N] [--pinned] [--find NAME]
+
+Arguments:
+    target_directory   Directory containing .swift files to index
+    --index            SQLite index file (default: obfuscation_map.index.sqlite beside target dir)
+    --full             Re-parse every file instead of only the changed ones
+    --jobs             Worker processes for parsing (default: 1, 0 = one per CPU)
+    --pinned           List func names bound to Apple APIs that SYSTEM_METHODS does not cover
+    --find             Print the declarations and reference sites of one name
+
+Examples:
+    python3 swift_symbol_index.py ./wldo
+    python3 swift_symbol_index.py ./wldo --pinned
+    python3 swift_symbol_index.py ./wldo --find setupUI
+    python3 swift_obfuscate.py ./wldo --index  # extraction queries the same index
+
+The index is a SQLite database of every declaration (types, protocols,
+properties, funcs with their modifiers and enclosing type) and every
+identifier reference site, per file. Updates are incremental: a file whose
+mtime and size are unchanged is not read, one whose content still hashes the
+same is not parsed, and only changed files are parsed again.
+"""
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+from collections import Counter
+
+from swift_lexer import iter_identifiers, CODE, INTERPOLATION, SELECTOR, OBJC_NAME
+from swift_obfuscate import SYSTEM_METHODS, swift_files, run_tasks, file_digest
+
+# Bump when the schema or what the parser records changes; older indexes are rebuilt
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE declarations (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    modifiers TEXT NOT NULL,
+    container TEXT,
+    container_kind TEXT,
+    inherits TEXT NOT NULL
+);
+CREATE TABLE refs (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    context TEXT NOT NULL
+);
+CREATE INDEX declarations_name ON declarations(name);
+CREATE INDEX declarations_file ON declarations(file_id);
+CREATE INDEX refs_name ON refs(name);
+CREATE INDEX refs_file ON refs(file_id);
+"""
+
+TYPE_KEYWORDS = {"class", "struct", "enum", "protocol", "extension", "actor"}
+MEMBER_KEYWORDS = {"func", "var", "let", "typealias", "associatedtype", "init", "subscript"}
+MODIFIERS = {
+    "override", "public", "private", "fileprivate", "internal", "open", "final",
+    "static", "class", "dynamic", "mutating", "nonmutating", "convenience",
+    "required", "lazy", "weak", "unowned", "optional", "indirect", "nonisolated",
+}
+# Swift keywords are never recorded as reference sites
+KEYWORDS = MODIFIERS | TYPE_KEYWORDS | MEMBER_KEYWORDS | {
+    "import", "return", "if", "else", "guard", "switch", "case", "default",
+    "for", "in", "while", "repeat", "break", "continue", "where", "do", "try",
+    "catch", "throw", "throws", "rethrows", "defer", "as", "is", "self", "Self",
+    "super", "nil", "true", "false", "async", "await", "some", "any", "inout",
+    "get", "set", "willSet", "didSet", "deinit", "fallthrough",
+}
+# Attributes whose declarations are bound by name from Interface Builder or Core Data
+PINNED_ATTRIBUTES = {"@IBAction", "@IBSegueAction", "@IBOutlet", "@IBInspectable", "@NSManaged"}
+# Too hidden to witness a protocol requirement
+PRIVATE_MODIFIERS = {"private", "fileprivate"}
+# Declarations whose inheritance clause may add protocol conformances
+CONFORMING_KINDS = {"class", "struct", "enum", "actor", "extension"}
+GENERIC_CLAUSE = re.compile(r'\s*<')
+OPEN_BRACKETS = {'(', '[', '{'}
+CLOSE_BRACKETS = {')', ']', '}'}
+REFERENCE_CONTEXTS = {CODE, INTERPOLATION, SELECTOR, OBJC_NAME}
+
+# A file modified this recently may change again within the same mtime tick
+RACY_SECONDS = 2
+
+def index_path(map_file: str) -> str:
+    """Index stored beside the map: obfuscation_map.json -> obfuscation_map.index.sqlite"""
+    return os.path.splitext(map_file)[0] + ".index.sqlite"
+
+def parse_source(text: str) -> tuple:
+    """Parse one source into (declarations, references).
+
+    declarations: (name, kind, line, modifiers, container, container_kind, inherits)
+    references:   (name, line, column, context)
+    """
+    tokens = list(iter_identifiers(text, structure=True))
+    declarations, references = [], []
+    scopes = []          # one entry per open '{': (kind, name, inherits, row) of a type, or None
+    pending_type = None  # type declaration waiting for its '{'
+    collecting = False   # inside pending_type's inheritance clause
+    generics_end = 0     # end of pending_type's <generic parameters>, which are not inherited
+    modifiers = []
+    line, line_pos = 1, 0
+
+    def site(token):
+        """(line, column) of a token at or after line_pos"""
+        return line + text.count('\n', line_pos, token.start), token.start - text.rfind('\n', 0, token.start)
+
+    def declare(token, kind):
+        # Members record the type whose braces they sit in directly; locals have none
+        scope = scopes[-1] if scopes else None
+        declarations.append((token.name, kind, site(token)[0], ' '.join(modifiers),
+                             scope[1] if scope else None, scope[0] if scope else None,
+                             ' '.join(scope[2]) if scope and kind not in TYPE_KEYWORDS else ''))
+
+    def refer(token):
+        references.append((token.name,) + site(token) + (token.context,))
+
+    i, count = 0, len(tokens)
+    while i < count:
+        token = tokens[i]
+        name = token.name
+        following = tokens[i + 1] if i + 1 < count else None
+        if token.start > line_pos:
+            line += text.count('\n', line_pos, token.start)
+            line_pos = token.start
+
+        if name[0] in '@#':
+            if name[0] == '@':
+                modifiers.append(name)
+            else:
+                modifiers = []
+            if following is not None and following.name == '(' and not text[token.end:following.start].strip():
+                # Skip the attribute's arguments, but keep their identifiers as references
+                depth = 0
+                for j in range(i + 1, count):
+                    if tokens[j].name in OPEN_BRACKETS:
+                        depth += 1
+                    elif tokens[j].name in CLOSE_BRACKETS:
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    elif tokens[j].context in REFERENCE_CONTEXTS and tokens[j].name not in KEYWORDS:
+                        refer(tokens[j])
+                i = j
+            i += 1
+            continue
+
+        if name == '{':
+            if pending_type is not None:
+                # The inheritance clause is complete now
+                row = declarations[pending_type[3]]
+                declarations[pending_type[3]] = row[:-1] + (' '.join(pending_type[2]),)
+            scopes.append(pending_type)
+            pending_type, collecting, modifiers = None, False, []
+        elif name == '}':
+            if scopes:
+                scopes.pop()
+            modifiers = []
+        elif name in OPEN_BRACKETS or name in CLOSE_BRACKETS:
+            modifiers = []
+        elif token.context != CODE:
+            if token.context in REFERENCE_CONTEXTS:
+                refer(token)
+            modifiers = []
+        elif name in MODIFIERS and (name != 'class' or (following is not None and
+                                                        (following.name in MEMBER_KEYWORDS or following.name in MODIFIERS))):
+            modifiers.append(name)
+        elif name in TYPE_KEYWORDS or name in MEMBER_KEYWORDS:
+            if following is not None and following.name[0] not in '@#([{)]}' and following.name not in KEYWORDS:
+                if name in TYPE_KEYWORDS:
+                    # Qualified extension targets (extension Foo.Bar) are recorded by their last part
+                    while (i + 2 < count and text[tokens[i + 1].end:tokens[i + 2].start].strip() == '.'
+                           and tokens[i + 2].name[0] not in '@#([{)]}'):
+                        i += 1
+                    following = tokens[i + 1]
+                    pending_type, collecting = (name, following.name, [], len(declarations)), True
+                    generics = GENERIC_CLAUSE.match(text, following.end)
+                    generics_end = text.find('>', generics.end()) + 1 if generics else 0
+                    declare(following, name)
+                    modifiers = []
+                elif name in ('var', 'let'):
+                    # Only stored/computed properties and globals: locals live in a non-type scope
+                    if not scopes or scopes[-1] is not None:
+                        declare(following, 'property')
+                    modifiers = []
+                elif name in ('func', 'typealias', 'associatedtype'):
+                    declare(following, 'func' if name == 'func' else 'typealias')
+                    modifiers = []
+                refer(following)
+                i += 2
+                continue
+            modifiers = []
+        else:
+            if collecting:
+                if name == 'where':
+                    collecting = False
+                elif token.start > generics_end:
+                    pending_type[2].append(name)
+            elif name not in KEYWORDS:
+                refer(token)
+            modifiers = []
+        i += 1
+    return declarations, references
+
+def parse_file(task: tuple):
+    """Parse one file. Returns (mtime_ns, size, sha256, parsed or None when the hash is unchanged)."""
+    path, cached_digest = task
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = file_digest(data)
+    parsed = None if digest == cached_digest else parse_source(data.decode('utf-8', errors='ignore'))
+    return stat.st_mtime_ns, stat.st_size, digest, parsed
+
+class SymbolIndex:
+    """SQLite index of declarations and reference sites of a Swift tree."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Written by another version: the parse results may differ, so start over
+            with self.db:
+                for (table,) in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                    self.db.execute(f"DROP TABLE {table}")
+                self.db.executescript(SCHEMA)
+                self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.db.close()
+
+    def _under(self, directory: str) -> tuple:
+        """SQL condition and parameters selecting files below directory"""
+        # Paths are stored below the real root, so a symlinked root finds the same rows
+        prefix = os.path.join(os.path.realpath(directory), '')
+        return "substr(files.path, 1, ?) = ?", (len(prefix), prefix)
+
+    def update(self, directory: str, jobs: int = 1, full: bool = False) -> tuple:
+        """Bring the index of directory up to date. Returns (files parsed, files indexed)."""
+        condition, params = self._under(directory)
+        known = {path: (file_id, mtime_ns, size, digest) for file_id, path, mtime_ns, size, digest in
+                 self.db.execute(f"SELECT id, path, mtime_ns, size, sha256 FROM files WHERE {condition}", params)}
+
+        paths, tasks = [], []
+        current = set()
+        root = os.path.realpath(directory)
+        for path in swift_files(directory):
+            key = os.path.join(root, os.path.relpath(path, directory))
+            current.add(key)
+            row = known.get(key)
+            if row is not None and not full:
+                stat = path.stat()
+                if row[1] == stat.st_mtime_ns and row[2] == stat.st_size:
+                    continue
+            paths.append(key)
+            tasks.append((key, row[3] if row is not None and not full else None))
+
+        parsed = 0
+        racy = time.time_ns() - RACY_SECONDS * 1_000_000_000
+        with self.db:
+            for path in set(known) - current:
+                self.db.execute("DELETE FROM files WHERE id = ?", (known[path][0],))
+            for path, (mtime_ns, size, digest, result) in zip(paths, run_tasks(parse_file, tasks, jobs)):
+                # Recently modified files are re-hashed next time rather than trusted by mtime
+                mtime_ns = -1 if mtime_ns > racy else mtime_ns
+                if result is None:
+                    self.db.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?", (mtime_ns, size, path))
+                    continue
+                parsed += 1
+                if path in known:
+                    self.db.execute("DELETE FROM files WHERE id = ?", (known[path][0],))
+                file_id = self.db.execute("INSERT INTO files (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+                                          (path, mtime_ns, size, digest)).lastrowid
+                declarations, references = result
+                self.db.executemany("INSERT INTO declarations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                    [(file_id,) + row for row in declarations])
+                self.db.executemany("INSERT INTO refs VALUES (?, ?, ?, ?, ?)",
+                                    [(file_id,) + row for row in references])
+        return parsed, len(current)
+
+    def declarations(self, directory: str, kind: str = None) -> list:
+        """(name, kind, modifiers, container, container_kind, inherits, path, line) below directory"""
+        condition, params = self._under(directory)
+        query = (f"SELECT d.name, d.kind, d.modifiers, d.container, d.container_kind, d.inherits, files.path, d.line "
+                 f"FROM declarations d JOIN files ON files.id = d.file_id WHERE {condition}")
+        if kind is not None:
+            query += " AND d.kind = ?"
+            params += (kind,)
+        return self.db.execute(query, params).fetchall()
+
+    def objc_names(self, directory: str) -> set:
+        """Names referenced from #selector / #keyPath / @objc(...)"""
+        condition, params = self._under(directory)
+        return {name for (name,) in self.db.execute(
+            f"SELECT DISTINCT refs.name FROM refs JOIN files ON files.id = refs.file_id "
+            f"WHERE {condition} AND refs.context IN (?, ?)", params + (SELECTOR, OBJC_NAME))}
+
+    def names(self, directory: str) -> set:
+        """Every name declared, inherited or referenced below directory"""
+        condition, params = self._under(directory)
+        names = set()
+        for name, inherits in self.db.execute(
+                f"SELECT refs.name, '' FROM refs JOIN files ON files.id = refs.file_id WHERE {condition} "
+                f"UNION SELECT d.name, d.inherits FROM declarations d JOIN files ON files.id = d.file_id WHERE {condition}",
+                params + params):
+            names.add(name)
+            names.update(inherits.split())
+        return names
+
+    def references(self, name: str) -> list:
+        """(path, line, column, context) of every reference site of name"""
+        return self.db.execute(
+            "SELECT files.path, refs.line, refs.col, refs.context FROM refs JOIN files ON files.id = refs.file_id "
+            "WHERE refs.name = ? ORDER BY files.path, refs.line, refs.col", (name,)).fetchall()
+
+    def reference_counts(self, directory: str, names) -> tuple:
+        """(reference sites, files) of names below directory"""
+        condition, params = self._under(directory)
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (name TEXT PRIMARY KEY)")
+        with self.db:
+            self.db.execute("DELETE FROM wanted")
+            self.db.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((name,) for name in names))
+        return self.db.execute(
+            f"SELECT COUNT(*), COUNT(DISTINCT refs.file_id) FROM refs JOIN files ON files.id = refs.file_id "
+            f"WHERE {condition} AND refs.name IN (SELECT name FROM wanted)", params).fetchone()
+
+    def pinned_names(self, directory: str) -> set:
+        """Func names whose declaration is bound to an API outside the tree.
+
+        - override of a method no superclass inside the tree declares
+        - @IBAction and other names Interface Builder / Core Data look up
+        - non-private members of a type or extension conforming to a protocol
+          not declared in the tree (a class's first inherited type counts as its
+          superclass unless it is one of the tree's protocols), unless the type
+          declares no more funcs of that name than the tree's protocols it
+          adopts require: renaming is by base name, so one extra overload of
+          collectionView next to a tree protocol's collectionView pins it
+        """
+        types, protocols, superclass = set(), set(), {}
+        requirements = {}     # protocol of the tree -> Counter of its func names
+        adopted = {}          # type name -> every type it inherits, across its extensions
+        declared = Counter()  # (type name, func name) -> funcs declared in the type and its extensions
+        own = {}   # type name -> func names it declares without override
+        funcs = []
+        for name, kind, modifiers, container, container_kind, inherits, _, _ in self.declarations(directory):
+            if kind in TYPE_KEYWORDS:
+                if kind != 'extension':
+                    types.add(name)
+                if kind == 'protocol':
+                    protocols.add(name)
+                if kind == 'class' and inherits:
+                    superclass.setdefault(name, inherits.split()[0])
+                adopted.setdefault(name, set()).update(inherits.split())
+            elif kind == 'func':
+                funcs.append((name, modifiers.split(), container, container_kind, inherits.split()))
+                if container_kind == 'protocol':
+                    requirements.setdefault(container, Counter())[name] += 1
+                elif container is not None:
+                    declared[container, name] += 1
+                    if 'override' not in modifiers.split():
+                        own.setdefault(container, set()).add(name)
+
+        def witnesses_own(name, container):
+            """Whether every func of this name in container can witness a protocol of the tree"""
+            required = sum(requirements[protocol][name] for protocol in adopted.get(container, ())
+                           if protocol in requirements)
+            return 0 < declared[container, name] <= required
+
+        def overrides_own(name, container):
+            seen = set()
+            cls = superclass.get(container)
+            while cls in types and cls not in seen:
+                if name in own.get(cls, ()):
+                    return True
+                seen.add(cls)
+                cls = superclass.get(cls)
+            return False
+
+        def conformances(container_kind, inherits):
+            if container_kind == 'class' and inherits and inherits[0] not in protocols:
+                return inherits[1:]
+            return inherits if container_kind in CONFORMING_KINDS else ()
+
+        pinned = set()
+        for name, modifiers, container, container_kind, inherits in funcs:
+            if PINNED_ATTRIBUTES.intersection(modifiers):
+                pinned.add(name)
+            elif 'override' in modifiers and not overrides_own(name, container):
+                pinned.add(name)
+            elif (container_kind != 'protocol' and not PRIVATE_MODIFIERS.intersection(modifiers)
+                  and any(protocol not in types for protocol in conformances(container_kind, inherits))
+                  and not witnesses_own(name, container)):
+                pinned.add(name)
+        return pinned
+
+    def method_names(self, directory: str, skip=SYSTEM_METHODS, sdk=None) -> set:
+        """Same contract as swift_obfuscate.extract_method_names, answered from the index.
+
+        Also leaves out pinned_names(), which a plain func scan cannot see.
+        """
+        declared = {name for name, *_ in self.declarations(directory, 'func')}
+        names = {name for name in declared if name not in skip and not name.startswith('_')
+                 and (sdk is None or name not in sdk)}
+        return names - self.objc_names(directory) - self.pinned_names(directory)
+
+def main():
+    parser = argparse.ArgumentParser(description="Swift Symbol Index")
+    parser.add_argument("directory", help="Target directory containing .swift files")
+    parser.add_argument("--index", default=None, help="SQLite index file")
+    parser.add_argument("--full", action="store_true", help="Re-parse every file")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for parsing (default: 1, 0 = one per CPU)")
+    parser.add_argument("--pinned", action="store_true", help="List names bound to Apple APIs not covered by SYSTEM_METHODS")
+    parser.add_argument("--find", default=None, help="Print declarations and reference sites of a name")
+    args = parser.parse_args()
+
+    target_dir = os.path.abspath(args.directory)
+    if not os.path.isdir(target_dir):
+        print(f"❌ Error: '{target_dir}' is not a valid directory.")
+        sys.exit(1)
+
+    path = args.index or index_path(os.path.join(os.path.dirname(target_dir), "obfuscation_map.json"))
+    index = SymbolIndex(path)
+    start = time.perf_counter()
+    parsed, total = index.update(target_dir, jobs=args.jobs or os.cpu_count(), full=args.full)
+    print(f"🗂️  Indexed {total} file(s) in {time.perf_counter() - start:.2f}s ({parsed} parsed, {total - parsed} unchanged): {path}")
+
+    if args.pinned:
+        pinned = sorted(index.pinned_names(target_dir) - SYSTEM_METHODS)
+        print(f"\n🔒 {len(pinned)} name(s) bound to outside APIs and not in SYSTEM_METHODS:")
+        for name in pinned:
+            print(f"   {name}")
+
+    if args.find:
+        print(f"\n🔍 {args.find}")
+        for name, kind, modifiers, container, _, _, file, line in index.declarations(target_dir):
+            if name == args.find:
+                print(f"   {kind:10s} {os.path.relpath(file, target_dir)}:{line}  {modifiers} {container or ''}")
+        references = index.references(args.find)
+        print(f"   {len(references)} reference site(s)")
+        for file, line, column, context in references[:50]:
+            print(f"   {os.path.relpath(file, target_dir)}:{line}:{column}  [{context}]")
+    index.close()
+
+if __name__ == "__main__":
+    main()
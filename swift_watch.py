@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Swift Obfuscation Watch Mode
+----------------------------
+Long-running mode behind `swift_obfuscate.py <dir> --watch <output_dir>`.
+
+The source tree is never modified: it is mirrored into the output directory
+with every .swift file obfuscated and every other file copied as is. The
+mapping and the scan result of every file stay in memory (with a map store,
+only the entries of names that occur in the tree), so when a file is saved
+only that file is scanned and re-emitted. Func names it declares for
+the first time are added to the map, which is saved right away; files that
+already referenced those names are re-emitted too. Outputs whose bytes did
+not change are not rewritten, so Xcode only recompiles what really changed.
+
+Changes are picked up with inotify (Linux, through ctypes) and otherwise by
+polling the tree every POLL_INTERVAL seconds (macOS, or --poll).
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import shutil
+import struct
+import ctypes
+import ctypes.util
+from collections import Counter
+
+from swift_obfuscate import build_mapping, scan_edits, splice, is_renamable, UsedNames
+from map_store import save_map
+
+POLL_INTERVAL = 0.5
+# Saves touch several files in a burst (editor temp file + rename); wait this long for the rest
+SETTLE_SECONDS = 0.05
+
+# <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+INOTIFY_EVENT = struct.Struct('iIII')
+
+def is_ignored(name):
+    """Hidden files and editor backups are neither watched nor mirrored"""
+    return name.startswith('.') or name.endswith('~')
+
+def walk_files(root):
+    """Every mirrored file below root (or root itself if it is a file)"""
+    if os.path.isfile(root):
+        yield root
+        return
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [name for name in dirs if not is_ignored(name)]
+        for name in files:
+            if not is_ignored(name):
+                yield os.path.join(directory, name)
+
+class InotifyWatcher:
+    """Recursive directory watch on top of the raw inotify syscalls."""
+
+    def __init__(self, root):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        # Raises AttributeError where libc has no inotify (macOS)
+        self.add_watch = libc.inotify_add_watch
+        self.add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self.watches = {}   # watch descriptor -> directory
+        self.add_tree(root)
+
+    def add_tree(self, top):
+        for directory, dirs, _ in os.walk(top):
+            dirs[:] = [name for name in dirs if not is_ignored(name)]
+            wd = self.add_watch(self.fd, os.fsencode(directory), WATCH_MASK | IN_ONLYDIR)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOSPC:
+                    raise OSError(error, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue
+            self.watches[wd] = directory
+
+    def _events(self):
+        """Changed paths of the events queued right now"""
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, pos)
+                name = os.fsdecode(data[pos + INOTIFY_EVENT.size:pos + INOTIFY_EVENT.size + length].rstrip(b'\0'))
+                pos += INOTIFY_EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost: have the whole tree looked at again
+                    changed.add(self.root)
+                    continue
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None or (name and is_ignored(name)):
+                    continue
+                path = os.path.join(directory, name) if name else directory
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+                changed.add(path)
+
+    def read(self):
+        """Block until something changes; return the changed files and directories"""
+        select.select([self.fd], [], [])
+        changed = self._events()
+        while select.select([self.fd], [], [], SETTLE_SECONDS)[0]:
+            changed |= self._events()
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback: compare (mtime, size) snapshots of the tree."""
+
+    def __init__(self, root, interval=POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        for path in walk_files(self.root):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read(self):
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._snapshot()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+def open_watcher(root, poll=False):
+    """inotify where the platform has it, polling otherwise"""
+    if not poll:
+        try:
+            return InotifyWatcher(root)
+        except (AttributeError, OSError) as e:
+            print(f"⚠️  inotify unavailable ({e}); polling every {POLL_INTERVAL}s")
+    return PollingWatcher(root)
+
+def write_if_changed(path, data):
+    """Write data to path unless it already holds exactly those bytes. Returns True if written."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+class WatchSession:
+    """In-memory mapping and per-file scan results of one mirrored tree."""
+
+    def __init__(self, source, output, mapping, map_file, prefix, seed=None, sdk=None, store=None):
+        self.source = source
+        self.output = output
+        self.mapping = dict(mapping)
+        self.mapping_bytes = {name.encode('utf-8'): value.encode('utf-8') for name, value in self.mapping.items()}
+        self.used = set(self.mapping.values())
+        self.map_file = map_file
+        self.store = store   # MapStore behind map_file, if it is one
+        # A store is not loaded: the names of scanned files are looked up as they appear
+        self.looked_up = set()
+        self.taken = UsedNames(self.used, store.obfuscated) if store is not None else self.used
+        self.prefix = prefix
+        self.seed = seed
+        self.sdk = sdk
+        self.infos = {}    # .swift source path -> SourceInfo of its original text
+        self.others = set()
+        # Number of files declaring / selector-referencing each name, kept up to date per file
+        # so a change only looks at the names it could have made renamable
+        self.declared = Counter()
+        self.objc = Counter()
+        self.pending = set()
+
+    def target(self, path):
+        return os.path.join(self.output, os.path.relpath(path, self.source))
+
+    def scan(self, path):
+        with open(path, 'rb') as f:
+            info = scan_edits(f.read())[1]
+        if path in self.infos:
+            self.forget(self.infos[path])
+        self.infos[path] = info
+        self.declared.update(info.declared)
+        self.objc.update(info.objc_names)
+        self.pending |= info.declared
+        if self.store is not None:
+            names = info.identifiers - self.looked_up
+            self.looked_up |= names
+            self.add_entries(self.store.lookup(names))
+
+    def forget(self, info):
+        """Drop the counts of a file's previous SourceInfo"""
+        for counts, names in ((self.declared, info.declared), (self.objc, info.objc_names)):
+            counts.subtract(names)
+            for name in names:
+                if counts[name] <= 0:
+                    del counts[name]
+        # Declared elsewhere, these may no longer be selector targets
+        self.pending.update(name for name in info.objc_names if name not in self.objc)
+
+    def add_entries(self, entries):
+        self.mapping.update(entries)
+        self.used.update(entries.values())
+        for name, value in entries.items():
+            self.mapping_bytes[name.encode('utf-8')] = value.encode('utf-8')
+
+    def emit(self, path):
+        """Write the obfuscated copy of one source; returns True if the output changed"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        return write_if_changed(self.target(path), splice(data, scan_edits(data, self.mapping_bytes)[0]))
+
+    def copy(self, path):
+        target = self.target(path)
+        try:
+            stat, copied = os.stat(path), os.stat(target)
+            if stat.st_size == copied.st_size and stat.st_mtime_ns == copied.st_mtime_ns:
+                return False
+        except OSError:
+            pass
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(path, target)
+        return True
+
+    def remove(self, path):
+        """Forget every tracked file at or below a path that no longer exists"""
+        prefix = os.path.join(path, '')
+        gone = [known for known in list(self.infos) + list(self.others) if known == path or known.startswith(prefix)]
+        for known in gone:
+            if known in self.infos:
+                self.forget(self.infos.pop(known))
+            self.others.discard(known)
+            try:
+                os.remove(self.target(known))
+            except OSError:
+                pass
+        if os.path.isdir(self.target(path)):
+            shutil.rmtree(self.target(path), ignore_errors=True)
+        return gone
+
+    def extend_mapping(self):
+        """Add names declared for the first time to the map and save it. Returns the new names."""
+        new_names = {name for name in self.pending
+                     if name in self.declared and name not in self.objc and name not in self.mapping
+                     and name not in self.taken and is_renamable(name, self.sdk)}
+        self.pending.clear()
+        if not new_names:
+            return set()
+        entries = build_mapping(new_names, self.prefix, seed=self.seed, taken=self.taken)
+        self.add_entries(entries)
+        self.save(entries)
+        return new_names
+
+    def save(self, new_entries):
+        if self.store is not None:
+            self.store.add(new_entries)
+        else:
+            save_map(self.map_file, self.mapping)
+
+    def update(self, paths):
+        """Bring the mirror up to date after changes to paths (files or directories).
+
+        Returns (files re-emitted, files removed, new names).
+        """
+        sources, emitted, removed = set(), set(), set()
+        for path in paths:
+            if not os.path.exists(path):
+                removed.update(self.remove(path))
+                continue
+            for file in walk_files(path):
+                if file.endswith('.swift'):
+                    try:
+                        self.scan(file)
+                    except OSError:
+                        continue
+                    sources.add(file)
+                else:
+                    self.others.add(file)
+                    if self.copy(file):
+                        emitted.add(file)
+
+        new_names = self.extend_mapping()
+        if new_names:
+            # Files that already used a name that only now became renamable
+            sources |= {path for path, info in self.infos.items() if not new_names.isdisjoint(info.identifiers)}
+        for path in sorted(sources):
+            try:
+                if self.emit(path):
+                    emitted.add(path)
+            except OSError:
+                continue
+        return emitted, removed, new_names
+
+def watch(source, output, mapping, map_file, prefix, seed=None, sdk=None, poll=False, store=None):
+    """Mirror source into output obfuscated, then keep it up to date until interrupted."""
+    session = WatchSession(source, output, mapping, map_file, prefix, seed, sdk, store)
+    start = time.perf_counter()
+    _, _, new_names = session.update([source])
+    if not new_names:
+        # Make sure the map file exists even when nothing new was declared
+        session.save({})
+    print(f"🪞 Mirrored {len(session.infos)} .swift and {len(session.others)} other file(s) into {output} "
+          f"in {time.perf_counter() - start:.2f}s ({len(session.mapping)} names mapped)")
+
+    watcher = open_watcher(source, poll)
+    print(f"👀 Watching {source} — Ctrl+C to stop")
+    try:
+        while True:
+            changed = watcher.read()
+            start = time.perf_counter()
+            emitted, removed, new_names = session.update(changed)
+            elapsed = (time.perf_counter() - start) * 1000
+            for path in sorted(emitted):
+                print(f"  🔁 {os.path.relpath(path, source)}")
+            for path in sorted(removed):
+                print(f"  🗑️  {os.path.relpath(path, source)}")
+            if new_names:
+                print(f"  ➕ {len(new_names)} new name(s) mapped and saved: {', '.join(sorted(new_names)[:10])}")
+            if emitted or removed or new_names:
+                print(f"  ⏱️  {elapsed:.1f} ms")
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    finally:
+        watcher.close()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+模板缓存 - 预渲染的渐变背景和圆形遮罩
+Gradient backgrounds and masks depend only on (size, colours), so each one is
+rendered once and reused for every avatar that shares it.
+
+The in-memory tier is an LRU of at most max_entries templates. Set
+AVATAR_TEMPLATE_DIR (or pass disk_dir) to also keep them as PNGs on disk,
+so later runs skip the render entirely.
+"""
+
+import os
+import re
+import tempfile
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+from gradients import radial_gradient
+
+# Bump when a template renderer changes, so stale PNGs on disk are not reused
+TEMPLATE_VERSION = 1
+
+class TemplateCache:
+    """LRU cache of rendered template images with an optional on-disk tier.
+
+    Templates are immutable: get() hands out a copy, never the cached image.
+    """
+
+    def __init__(self, max_entries=64, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.images = OrderedDict()
+        self.hits = self.misses = 0
+
+    def disk_path(self, key):
+        name = "_".join(re.sub(r'[^A-Za-z0-9]+', '', str(part)) for part in key)
+        return os.path.join(self.disk_dir, f"v{TEMPLATE_VERSION}_{name}.png")
+
+    def load(self, key):
+        if self.disk_dir is None:
+            return None
+        path = self.disk_path(key)
+        if not os.path.exists(path):
+            return None
+        with Image.open(path) as img:
+            img.load()
+            return img
+
+    def store(self, key, img):
+        if self.disk_dir is None:
+            return
+        os.makedirs(self.disk_dir, exist_ok=True)
+        path = self.disk_path(key)
+        # Write then rename, so a parallel run never reads a half-written PNG
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.png')
+        with os.fdopen(fd, 'wb') as f:
+            img.save(f, 'PNG')
+        os.replace(tmp_path, path)
+
+    def get(self, key, render):
+        """Template for key, calling render() only if neither tier has it."""
+        img = self.images.get(key)
+        if img is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return img.copy()
+
+        self.misses += 1
+        img = self.load(key)
+        if img is None:
+            img = render()
+            self.store(key, img)
+        self.images[key] = img
+        if len(self.images) > self.max_entries:
+            self.images.popitem(last=False)
+        return img.copy()
+
+TEMPLATES = TemplateCache(disk_dir=os.environ.get("AVATAR_TEMPLATE_DIR"))
+
+def circular_mask(size):
+    """'L' mask that is opaque inside the circle inscribed in size"""
+    def render():
+        mask = Image.new('L', size, 0)
+        draw = ImageDraw.Draw(mask)
+        draw.ellipse([0, 0, size[0], size[1]], fill=255)
+        return mask
+    return TEMPLATES.get(("mask", size[0], size[1]), render)
+
+def round_gradient(size, color1, color2):
+    """Round RGBA avatar background: radial gradient with the circular mask applied"""
+    def render():
+        output = Image.new('RGBA', (size, size), (255, 255, 255, 0))
+        output.paste(radial_gradient(size, size, color1, color2), (0, 0))
+        output.putalpha(circular_mask((size, size)))
+        return output
+    return TEMPLATES.get(("round", size, color1, color2), render)
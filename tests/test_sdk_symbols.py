@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sdk_symbols import SymbolSet
+
+
+class LoadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ios.sdkset")
+        SymbolSet.build({"viewDidLoad", "tableView"}).save(self.path)
+        with open(self.path, "rb") as f:
+            self.data = f.read()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+        return SymbolSet.load(self.path)
+
+    def test_round_trip(self):
+        symbols = self.load(self.data)
+        self.assertIn("tableView", symbols)
+        self.assertNotIn("loadFeed", symbols)
+
+    def test_empty_or_truncated_file_raises_value_error(self):
+        for data in (b"", self.data[:10], self.data[:-8]):
+            with self.assertRaisesRegex(ValueError, "ios.sdkset"):
+                self.load(data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swift_obfuscate import apply_obfuscation, RewriteReport
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "swift_obfuscate.py")
+
+HELPER = "func helperThing() {}\nfunc caller() { helperThing() }\n"
+MAPPING = {"helperThing": "ox_helper"}
+
+class LinkedSourcesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "app"))
+        os.makedirs(os.path.join(self.root, "shared"))
+        self.shared = os.path.join(self.root, "shared", "H.swift")
+        with open(self.shared, "w") as f:
+            f.write(HELPER)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_symlinked_source_is_rewritten_at_its_target(self):
+        link = os.path.join(self.root, "app", "H.swift")
+        os.symlink(os.path.join("..", "shared", "H.swift"), link)
+        self.assertEqual(apply_obfuscation(os.path.join(self.root, "app"), MAPPING), 1)
+        self.assertTrue(os.path.islink(link))
+        self.assertIn("ox_helper()", self.read(self.shared))
+
+    def test_hard_linked_source_keeps_its_links(self):
+        link = os.path.join(self.root, "app", "H.swift")
+        os.link(self.shared, link)
+        # With a diff, which is built from the original bytes before they are overwritten
+        diff = io.StringIO()
+        report = RewriteReport(os.path.join(self.root, "app"), MAPPING, dry_run=False, diff=diff)
+        self.assertEqual(apply_obfuscation(os.path.join(self.root, "app"), MAPPING, report=report), 1)
+        self.assertEqual(os.stat(link).st_ino, os.stat(self.shared).st_ino)
+        self.assertEqual(self.read(self.shared), HELPER.replace("helperThing", "ox_helper"))
+        self.assertIn("-func helperThing() {}", diff.getvalue())
+
+class SkipWithExistingMapTest(unittest.TestCase):
+    SOURCE = "func addCoins() {}\nfunc refresh() { addCoins() }\n"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tree = os.path.join(self.tmp.name, "app")
+        os.makedirs(self.tree)
+        self.source = os.path.join(self.tree, "Wallet.swift")
+        self.map_file = os.path.join(self.tmp.name, "map.json")
+        with open(self.map_file, "w") as f:
+            json.dump({"addCoins": "ox_add", "refresh": "ox_refresh"}, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_obfuscate(self, *extra):
+        subprocess.run([sys.executable, SCRIPT, self.tree, "--map-file", self.map_file] + list(extra),
+                       check=True, capture_output=True)
+        with open(self.source) as f, open(self.map_file) as m:
+            return f.read(), json.load(m)
+
+    def test_skipped_name_in_the_map_is_not_renamed(self):
+        with open(self.source, "w") as f:
+            f.write(self.SOURCE)
+        text, mapping = self.run_obfuscate("--skip", "addCoins")
+        self.assertEqual(text, "func addCoins() {}\nfunc ox_refresh() { addCoins() }\n")
+        self.assertNotIn("addCoins", mapping)
+        self.assertEqual(mapping["refresh"], "ox_refresh")
+
+    def test_skipped_name_already_renamed_is_restored(self):
+        with open(self.source, "w") as f:
+            f.write("func ox_add() {}\nfunc ox_refresh() { ox_add() }\n")
+        text, mapping = self.run_obfuscate("--skip", "addCoins")
+        self.assertEqual(text, "func addCoins() {}\nfunc ox_refresh() { addCoins() }\n")
+        self.assertNotIn("addCoins", mapping)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swift_symbol_index import SymbolIndex
+
+INLINE_CONFORMANCE = """
+protocol FeedLayoutDelegate: AnyObject {
+    func tableView(_ tableView: UITableView, heightFor row: Int) -> CGFloat
+    func feedDidRefresh()
+}
+
+class FeedViewController: UIViewController, UITableViewDataSource, FeedLayoutDelegate {
+    func tableView(_ tableView: UITableView, numberOfRowsInSection section: Int) -> Int { 0 }
+    func tableView(_ tableView: UITableView, cellForRowAt indexPath: IndexPath) -> UITableViewCell { UITableViewCell() }
+    func tableView(_ tableView: UITableView, heightFor row: Int) -> CGFloat { 44 }
+    func feedDidRefresh() {}
+    private func reloadFeed() {}
+}
+
+struct Row: Hashable {
+    func hash(into hasher: inout Hasher) {}
+}
+
+class Cache {
+    func store() {}
+}
+"""
+
+class PinnedNamesTest(unittest.TestCase):
+    def pinned(self, source):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "Feed.swift"), "w") as f:
+                f.write(source)
+            index = SymbolIndex(os.path.join(directory, "index.sqlite"))
+            try:
+                index.update(directory)
+                return index.pinned_names(directory)
+            finally:
+                index.close()
+
+    def test_inline_conformance_pins_sdk_witnesses(self):
+        pinned = self.pinned(INLINE_CONFORMANCE)
+        # UITableViewDataSource callbacks share the base name with the tree protocol's requirement
+        self.assertIn("tableView", pinned)
+        self.assertIn("hash", pinned)
+
+    def test_tree_protocol_witnesses_and_private_members_stay_renamable(self):
+        pinned = self.pinned(INLINE_CONFORMANCE)
+        self.assertNotIn("feedDidRefresh", pinned)
+        self.assertNotIn("reloadFeed", pinned)
+        self.assertNotIn("store", pinned)
+
+    def test_symlinked_root_finds_the_same_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            real = os.path.join(directory, "real")
+            os.mkdir(real)
+            with open(os.path.join(real, "Feed.swift"), "w") as f:
+                f.write(INLINE_CONFORMANCE)
+            link = os.path.join(directory, "link")
+            os.symlink(real, link)
+            index = SymbolIndex(os.path.join(directory, "index.sqlite"))
+            try:
+                index.update(real)
+                self.assertEqual(index.update(link), (0, 1))
+                self.assertEqual(index.method_names(link), index.method_names(real))
+                self.assertEqual(index.pinned_names(link), index.pinned_names(real))
+            finally:
+                index.close()
+
+if __name__ == "__main__":
+    unittest.main()
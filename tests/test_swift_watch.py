@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swift_watch import WatchSession
+
+
+class IncrementalMappingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "src")
+        os.makedirs(self.source)
+        self.session = WatchSession(self.source, os.path.join(self.tmp.name, "out"), {},
+                                    os.path.join(self.tmp.name, "map.json"), "ox", seed="watch")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.source, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_changed_file_adds_only_its_new_names(self):
+        self.write("A.swift", "func loadFeed() {}\n")
+        self.assertEqual(self.session.update([self.source])[2], {"loadFeed"})
+        path = self.write("B.swift", "func saveFeed() { loadFeed() }\n")
+        self.assertEqual(self.session.update([path])[2], {"saveFeed"})
+        self.assertEqual(self.session.update([path])[2], set())
+
+    def test_selector_target_becomes_renamable_when_its_reference_goes(self):
+        self.write("A.swift", "func tapped() {}\n")
+        button = self.write("B.swift", "func setup() { button.addTarget(self, action: #selector(tapped)) }\n")
+        self.assertEqual(self.session.update([self.source])[2], {"setup"})
+        self.write("B.swift", "func setup() {}\n")
+        self.assertEqual(self.session.update([button])[2], {"tapped"})
+
+    def test_removed_file_no_longer_counts(self):
+        self.write("A.swift", "func tapped() {}\n")
+        button = self.write("B.swift", "func setup() { button.addTarget(self, action: #selector(tapped)) }\n")
+        self.session.update([self.source])
+        os.remove(button)
+        self.assertEqual(self.session.update([button])[2], {"tapped"})
+        self.assertNotIn("setup", self.session.declared)
+
+
+if __name__ == "__main__":
+    unittest.main()
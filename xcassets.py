@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Assets.xcassets 图片集输出 - @1x/@2x/@3x + Contents.json
+Writes a complete <name>.imageset directory in the format Xcode itself uses
+(see wldo/Assets.xcassets/*.imageset/Contents.json), so generated images no
+longer have to be dragged into the asset catalog by hand.
+
+Only the @3x master is rendered; @2x and @1x are downsampled from it in C
+(Image.reduce / Image.resize). Every PNG goes through png_optimize.py.
+Files whose bytes are unchanged are not rewritten, so Xcode sees no
+modification.
+"""
+
+import os
+import json
+
+from PIL import Image
+
+from png_optimize import optimized_png
+
+SCALES = (1, 2, 3)
+MASTER_SCALE = 3
+# Bump when the imageset layout, downsampling or PNG encoding changes, to invalidate render keys
+XCASSETS_VERSION = 2
+
+CATALOG_INFO = {"author": "xcode", "version": 1}
+
+def scale_filename(name, scale):
+    """name.png for @1x, name@2x.png / name@3x.png otherwise"""
+    return f"{name}.png" if scale == 1 else f"{name}@{scale}x.png"
+
+def imageset_key(render_key):
+    """Render key of a whole imageset built from the image keyed render_key"""
+    return f"{render_key}:imageset-v{XCASSETS_VERSION}"
+
+def contents_json(name, scales=SCALES):
+    """Contents.json of an imageset, formatted exactly like Xcode writes it"""
+    data = {
+        "images": [
+            {"filename": scale_filename(name, scale), "idiom": "universal", "scale": f"{scale}x"}
+            for scale in scales
+        ],
+        "info": CATALOG_INFO,
+    }
+    return json.dumps(data, indent=2, separators=(',', ' : '), sort_keys=True) + "\n"
+
+def downsample(master, scale, master_scale=MASTER_SCALE):
+    """Image at scale from a master rendered at master_scale"""
+    if scale == master_scale:
+        return master
+    if master_scale % scale == 0:
+        # Integer factor: box average straight from the master
+        return master.reduce(master_scale // scale)
+    width, height = master.size
+    return master.resize((width * scale // master_scale, height * scale // master_scale), Image.LANCZOS)
+
+def write_if_changed(path, data):
+    """Write data to path unless it already holds exactly those bytes. Returns True if written."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    # Replace atomically so Xcode never picks up a half-written image or Contents.json
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+def ensure_catalog(catalog_dir):
+    """Create catalog_dir as an asset catalog if it does not exist yet"""
+    os.makedirs(catalog_dir, exist_ok=True)
+    contents = os.path.join(catalog_dir, "Contents.json")
+    if not os.path.exists(contents):
+        write_if_changed(contents, (json.dumps({"info": CATALOG_INFO}, indent=2, separators=(',', ' : '),
+                                               sort_keys=True) + "\n").encode('utf-8'))
+
+def write_imageset(imageset_dir, master, scales=SCALES, master_scale=MASTER_SCALE):
+    """Write <name>.imageset from a master rendered at master_scale.
+
+    PNGs left over from an earlier layout are removed. Returns True if
+    anything on disk changed.
+    """
+    name = os.path.splitext(os.path.basename(imageset_dir))[0]
+    os.makedirs(imageset_dir, exist_ok=True)
+
+    wanted = {"Contents.json"}
+    changed = write_if_changed(os.path.join(imageset_dir, "Contents.json"),
+                               contents_json(name, scales).encode('utf-8'))
+    for scale in scales:
+        filename = scale_filename(name, scale)
+        wanted.add(filename)
+        data = optimized_png(downsample(master, scale, master_scale))
+        changed = write_if_changed(os.path.join(imageset_dir, filename), data) or changed
+
+    for filename in os.listdir(imageset_dir):
+        if filename not in wanted and filename.lower().endswith('.png'):
+            os.remove(os.path.join(imageset_dir, filename))
+            changed = True
+    return changed
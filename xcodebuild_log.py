@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+xcodebuild Log Analyzer
+-----------------------
+Usage:
+    python3 xcodebuild_log.py [<log_file> ...] [--map-file MAP_JSON] [--top N] [--json] [--emit-skip]
+
+Arguments:
+    log_file     Raw xcodebuild output (default: stdin; '-' also means stdin)
+    --map-file   obfuscation_map.json (or a *.oxmap store) to cross-reference: diagnostics mentioning a renamed
+                 function are attributed to its mapping entry
+    --top        How many files / symbols / slow steps to list (default: 20)
+    --json       Print the full report as JSON instead of text
+    --emit-skip  Print only the comma-separated names to pass to swift_obfuscate.py --skip
+
+Examples:
+    python3 xcodebuild_log.py build.log
+    xcodebuild ... 2>&1 | python3 xcodebuild_log.py --map-file obfuscation_map.json
+    python3 swift_obfuscate.py ./wldo --skip "$(python3 xcodebuild_log.py build.log --map-file obfuscation_map.json --emit-skip)"
+
+The log is read one line at a time, so memory depends on the number of
+distinct diagnostics, not on the size of the log. Diagnostics repeated for
+every architecture are counted once.
+
+Symbols come from the quoted names in each message ('ox_a3Fk9mXz'); when a
+message names no mapped symbol, the source excerpt xcodebuild prints under it
+is checked for obfuscated names instead.
+
+Timings are summarized from whatever the log contains: the Build Timing
+Summary (-showBuildTimingSummary), per-function type-checking times
+(-Xfrontend -debug-time-function-bodies) and the number of build steps of
+each kind.
+"""
+
+import re
+import sys
+import json
+import heapq
+import argparse
+from collections import Counter, defaultdict
+
+from map_store import load_map
+
+# /path/File.swift:12:5: error: message     |     /path/project.xcodeproj: error: message
+DIAGNOSTIC = re.compile(r'^(?P<path>[^:\s][^:]*?)(?::(?P<line>\d+)(?::(?P<column>\d+))?)?: '
+                        r'(?P<severity>error|warning): (?P<message>.*)$')
+# Tool output without a source location: "xcodebuild: error: ...", "... [MT] warning: ..."
+LOOSE_DIAGNOSTIC = re.compile(r'\b(?P<severity>error|warning): (?P<message>.*)$')
+# A build step header starts in column 0: "SwiftCompile normal arm64 /path/File.swift (in target ..."
+# ("Build settings from command line:" and similar prose is not a step)
+STEP = re.compile(r"^(?P<kind>[A-Z][A-Za-z]+)(?:$| (?![a-z])|(?=.*\(in target '))")
+# Build Timing Summary: "CompileSwiftSources (4 tasks) | 12.345 seconds"
+TIMING = re.compile(r'^(?P<step>[A-Z][A-Za-z]+(?: [A-Za-z]+)*) \((?P<tasks>\d+) tasks?\) \| (?P<seconds>[\d.]+) seconds$')
+# -debug-time-function-bodies: "12.34ms\t/path/File.swift:10:5\tinstance method foo()"
+FUNCTION_TIME = re.compile(r'^(?P<ms>\d+(?:\.\d+)?)ms\t(?P<location>[^\t]+)\t(?P<what>.*)$')
+RESULT = re.compile(r'^\*\* (?P<result>[A-Z ]+) \*\*(?: \[(?P<seconds>[\d.]+) sec\])?')
+# 'name' or 'name(_:)', but not the s in "Xcode's"
+QUOTED_NAME = re.compile(r"(?<![A-Za-z0-9])'([A-Za-z_][A-Za-z0-9_]*)(?:\([^']*\))?'")
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+class LogAnalysis:
+    """Accumulates everything of interest from an xcodebuild log fed line by line."""
+
+    def __init__(self, mapping: dict = None, top: int = 20):
+        self.mapping = mapping or {}
+        self.inverse = {obfuscated: original for original, obfuscated in self.mapping.items()}
+        self.top = top
+
+        self.seen = set()                          # (path, line, column, severity, message)
+        self.by_file = defaultdict(Counter)        # path -> Counter(severity)
+        self.by_symbol = defaultdict(Counter)      # symbol -> Counter(severity)
+        self.symbol_files = defaultdict(set)       # symbol -> paths
+        self.diagnostics = defaultdict(list)       # path -> [(line, column, severity, message)]
+        self.blamed = defaultdict(Counter)         # original name -> Counter(severity)
+        self.steps = Counter()                     # step kind -> count
+        self.timings = []                          # (step, tasks, seconds)
+        self.slow_functions = []                   # min-heap of (ms, location, what)
+        self.results = []                          # (result, seconds)
+        self.pending = None                        # diagnostic waiting for its source excerpt
+        self.lines = 0
+
+    def mapped(self, symbol: str):
+        """Original name of the mapping entry symbol belongs to, if any."""
+        if symbol in self.inverse:
+            return self.inverse[symbol]
+        if symbol in self.mapping:
+            return symbol
+        return None
+
+    def add_diagnostic(self, path, line, column, severity, message):
+        key = (path, line, column, severity, message)
+        if key in self.seen:
+            return None
+        self.seen.add(key)
+        self.by_file[path][severity] += 1
+        self.diagnostics[path].append((line, column, severity, message))
+
+        symbols = set(QUOTED_NAME.findall(message)) - {'_'}
+        for symbol in symbols:
+            self.by_symbol[symbol][severity] += 1
+            self.symbol_files[symbol].add(path)
+        blamed = {self.mapped(symbol) for symbol in symbols} - {None}
+        for original in blamed:
+            self.blamed[original][severity] += 1
+        return severity, blamed
+
+    def feed(self, line: str):
+        self.lines += 1
+        line = line.rstrip('\r\n')
+
+        if self.pending is not None:
+            # The first line after a diagnostic is the offending source line
+            severity, blamed = self.pending
+            self.pending = None
+            if not blamed and self.mapping:
+                for symbol in set(IDENTIFIER.findall(line)):
+                    if symbol in self.inverse:
+                        self.blamed[self.inverse[symbol]][severity] += 1
+                        self.by_symbol[symbol][severity] += 1
+
+        match = DIAGNOSTIC.match(line)
+        if match:
+            self.pending = self.add_diagnostic(match['path'], int(match['line'] or 0), int(match['column'] or 0),
+                                               match['severity'], match['message'])
+            return
+        match = TIMING.match(line)
+        if match:
+            self.timings.append((match['step'], int(match['tasks']), float(match['seconds'])))
+            return
+        match = STEP.match(line)
+        if match:
+            if line != "Build Timing Summary":
+                self.steps[match['kind']] += 1
+            return
+        match = FUNCTION_TIME.match(line)
+        if match:
+            item = (float(match['ms']), match['location'], match['what'])
+            if len(self.slow_functions) < self.top:
+                heapq.heappush(self.slow_functions, item)
+            elif item > self.slow_functions[0]:
+                heapq.heapreplace(self.slow_functions, item)
+            return
+        match = RESULT.match(line)
+        if match:
+            self.results.append((match['result'], float(match['seconds']) if match['seconds'] else None))
+            return
+        match = LOOSE_DIAGNOSTIC.search(line)
+        if match and not line.startswith(' '):
+            self.add_diagnostic("(no file)", 0, 0, match['severity'], match['message'])
+
+    def skip_names(self) -> list:
+        """Originals whose renaming produced errors: candidates for swift_obfuscate.py --skip"""
+        return sorted(name for name, counts in self.blamed.items() if counts['error'])
+
+    def report(self) -> dict:
+        totals = Counter()
+        for counts in self.by_file.values():
+            totals.update(counts)
+        return {
+            "lines": self.lines,
+            "errors": totals['error'],
+            "warnings": totals['warning'],
+            "results": [{"result": result, "seconds": seconds} for result, seconds in self.results],
+            "files": {
+                path: {
+                    "errors": self.by_file[path]['error'],
+                    "warnings": self.by_file[path]['warning'],
+                    "diagnostics": [{"line": line, "column": column, "severity": severity, "message": message}
+                                    for line, column, severity, message in sorted(self.diagnostics[path])],
+                }
+                for path in sorted(self.by_file)
+            },
+            "symbols": {
+                symbol: {"errors": counts['error'], "warnings": counts['warning'],
+                         "files": sorted(self.symbol_files[symbol]), "original": self.mapped(symbol)}
+                for symbol, counts in sorted(self.by_symbol.items())
+            },
+            "mapping_entries": {
+                original: {"obfuscated": self.mapping[original], "errors": counts['error'],
+                           "warnings": counts['warning']}
+                for original, counts in sorted(self.blamed.items())
+            },
+            "skip": self.skip_names(),
+            "steps": dict(self.steps.most_common()),
+            "timing_summary": [{"step": step, "tasks": tasks, "seconds": seconds}
+                               for step, tasks, seconds in sorted(self.timings, key=lambda t: -t[2])],
+            "slowest_functions": [{"ms": ms, "location": location, "what": what}
+                                  for ms, location, what in sorted(self.slow_functions, reverse=True)],
+        }
+
+def analyze(paths: list, mapping: dict = None, top: int = 20) -> LogAnalysis:
+    analysis = LogAnalysis(mapping, top)
+    for path in paths:
+        if path == '-':
+            for line in sys.stdin:
+                analysis.feed(line)
+        else:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    analysis.feed(line)
+    return analysis
+
+def print_report(report: dict, top: int):
+    print(f"📄 {report['lines']:,} lines: {report['errors']} error(s), {report['warnings']} warning(s)")
+    for result in report["results"]:
+        took = f" in {result['seconds']:.1f}s" if result["seconds"] is not None else ""
+        print(f"   ** {result['result']} **{took}")
+
+    files = sorted(report["files"].items(), key=lambda item: (-item[1]["errors"], -item[1]["warnings"], item[0]))
+    if files:
+        print(f"\n📁 By file:")
+        for path, entry in files[:top]:
+            print(f"   {entry['errors']:4d} E {entry['warnings']:4d} W  {path}")
+            for diagnostic in entry["diagnostics"]:
+                if diagnostic["severity"] == "error":
+                    print(f"          {diagnostic['line']}:{diagnostic['column']}: {diagnostic['message']}")
+
+    symbols = sorted(report["symbols"].items(), key=lambda item: (-item[1]["errors"], -item[1]["warnings"], item[0]))
+    if symbols:
+        print(f"\n🔤 By symbol:")
+        for symbol, entry in symbols[:top]:
+            original = f"  (← {entry['original']})" if entry["original"] and entry["original"] != symbol else ""
+            print(f"   {entry['errors']:4d} E {entry['warnings']:4d} W  {symbol}{original}")
+
+    if report["mapping_entries"]:
+        print(f"\n🗺️  Mapping entries involved:")
+        for original, entry in report["mapping_entries"].items():
+            print(f"   {original:40s} → {entry['obfuscated']}  ({entry['errors']} E, {entry['warnings']} W)")
+    if report["skip"]:
+        print(f"\n💡 Re-run with: --skip {','.join(report['skip'])}")
+
+    if report["timing_summary"]:
+        print(f"\n⏱️  Build timing summary:")
+        for timing in report["timing_summary"][:top]:
+            print(f"   {timing['seconds']:9.3f}s  {timing['step']} ({timing['tasks']} task(s))")
+    if report["slowest_functions"]:
+        print(f"\n🐢 Slowest function bodies:")
+        for function in report["slowest_functions"]:
+            print(f"   {function['ms']:9.1f}ms  {function['location']}  {function['what']}")
+    if report["steps"]:
+        print(f"\n🔧 Build steps:")
+        for kind, count in list(report["steps"].items())[:top]:
+            print(f"   {count:5d}  {kind}")
+
+def main():
+    parser = argparse.ArgumentParser(description="xcodebuild log analyzer")
+    parser.add_argument("logs", nargs="*", default=['-'], help="xcodebuild logs (default: stdin)")
+    parser.add_argument("--map-file", default=None, help="obfuscation_map.json to cross-reference")
+    parser.add_argument("--top", type=int, default=20, help="How many entries to list per section (default: 20)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--emit-skip", action="store_true", help="Print only the names to pass to --skip")
+    args = parser.parse_args()
+
+    mapping = {}
+    if args.map_file:
+        try:
+            mapping = load_map(args.map_file)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: cannot read map '{args.map_file}': {e}", file=sys.stderr)
+            sys.exit(1)
+
+    analysis = analyze(args.logs, mapping, args.top)
+    if args.emit_skip:
+        print(','.join(analysis.skip_names()))
+    elif args.json:
+        json.dump(analysis.report(), sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print_report(analysis.report(), args.top)
+
+if __name__ == "__main__":
+    main()